@@ -4,3 +4,9 @@
 from . import models
 from . import report
 from . import wizard
+
+
+def _fleet_post_init(env):
+    # the refresh crons did not exist yet when the reports queued their rebuild
+    for model_name in ('fleet.vehicle.cost.report', 'fleet.vehicle.odometer.report'):
+        env[model_name]._trigger_report_cron()
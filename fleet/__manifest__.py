@@ -2,7 +2,7 @@
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 {
     'name' : 'Fleet',
-    'version' : '0.1',
+    'version' : '0.2',
     'sequence': 185,
     'category': 'Human Resources/Fleet',
     'website' : 'https://www.odoo.com/app/fleet',
@@ -46,6 +46,7 @@ Main Features
     ],
 
     'demo': ['data/fleet_demo.xml'],
+    'post_init_hook': '_fleet_post_init',
 
     'installable': True,
     'application': True,
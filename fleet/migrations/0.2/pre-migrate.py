@@ -0,0 +1,15 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+
+def migrate(cr, version):
+    # vehicle_type became a stored related field: fill the column from the
+    # models at once, so that the registry does not recompute it vehicle by
+    # vehicle
+    cr.execute("ALTER TABLE fleet_vehicle ADD COLUMN IF NOT EXISTS vehicle_type varchar")
+    cr.execute("""
+        UPDATE fleet_vehicle v
+           SET vehicle_type = m.vehicle_type
+          FROM fleet_vehicle_model m
+         WHERE m.id = v.model_id
+           AND v.vehicle_type IS DISTINCT FROM m.vehicle_type
+    """)
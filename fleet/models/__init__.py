@@ -1,15 +1,19 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
+from . import fleet_export_mixin
 from . import fleet_service_type
 from . import fleet_vehicle
 from . import fleet_vehicle_assignation_log
 from . import fleet_vehicle_log_contract
+from . import fleet_vehicle_log_contract_cost
 from . import fleet_vehicle_log_services
+from . import fleet_vehicle_log_services_rollup
 from . import fleet_vehicle_model
 from . import fleet_vehicle_model_brand
 from . import fleet_vehicle_model_category
 from . import fleet_vehicle_odometer
+from . import fleet_vehicle_send_mail_job
 from . import fleet_vehicle_state
 from . import fleet_vehicle_tag
 from . import mail_activity_type
@@ -0,0 +1,156 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import csv
+import io
+import json
+import tempfile
+
+from odoo import _, api, models
+from odoo.exceptions import UserError
+from odoo.fields import Domain
+from odoo.tools import json_default
+
+# maximum number of records returned by a call to export_chunk()
+EXPORT_CHUNK_LIMIT = 10000
+
+
+class FleetExportMixin(models.AbstractModel):
+    """ Export large amounts of fleet records by chunks.
+
+    ``_export_chunks()`` pages through the records matching a domain by
+    increasing id: each chunk is fetched with an ``id > last id`` condition
+    on the primary key index, so that fetching a chunk does not depend on
+    the number of records exported before it, unlike an offset. The record
+    cache is invalidated after each chunk, keeping the memory flat however
+    many records are exported.
+
+    Each chunk comes with a resume token, that restarts the export right
+    after that chunk when given back to ``_export_chunks()`` or to the
+    writers ``_export_jsonl()`` and ``_export_csv()``. External clients
+    export the records one chunk per call with ``export_chunk()``.
+    """
+    _name = 'fleet.export.mixin'
+    _description = "Fleet Records Export"
+
+    def _export_token(self, last_id):
+        return f'{self._name},{last_id}'
+
+    def _export_parse_token(self, token):
+        """ Return the id of the last record exported before ``token``. """
+        if not token:
+            return 0
+        model_name, _sep, last_id = token.rpartition(',')
+        if model_name != self._name or not last_id.isdigit():
+            raise UserError(_("The resume token %(token)s is not a token of %(model)s.", token=token, model=self._description))
+        return int(last_id)
+
+    @api.model
+    def _export_chunks(self, domain, field_names, resume_token=None, chunk_size=1000):
+        """ Generate the values of the records matching ``domain``, by chunks
+        of ``chunk_size`` records ordered by id.
+
+        :param list field_names: the fields to export, the id being always
+            exported; relational fields are exported as ids
+        :param str resume_token: the token of the last chunk already exported
+        :return: an iterator of ``(rows, resume_token)`` pairs, with ``rows``
+            the list of the values of the records of the chunk, as dicts
+        """
+        last_id = self._export_parse_token(resume_token)
+        while True:
+            records = self.search_fetch(
+                Domain.AND([domain, [('id', '>', last_id)]]), field_names, limit=chunk_size, order='id',
+            )
+            if not records:
+                return
+            rows = records.read(field_names, load=None)
+            last_id = records[-1].id
+            self.env.invalidate_all()
+            yield rows, self._export_token(last_id)
+            if len(records) < chunk_size:
+                return
+
+    @api.model
+    def export_chunk(self, domain, fields, resume_token=None, limit=1000):
+        """ Return the next chunk of at most ``limit`` records matching
+        ``domain``, ordered by id, after the chunk of ``resume_token``.
+
+        :param list fields: the fields to export, the id being always
+            exported; relational fields are exported as ids
+        :param str resume_token: the ``next_token`` of the previous chunk
+        :param int limit: the size of the chunk, at most ``EXPORT_CHUNK_LIMIT``
+        :return: a dict with the values of the records of the chunk in
+            ``rows``, and the token of the next chunk in ``next_token``, or
+            ``False`` when the chunk is the last one
+        """
+        limit = min(int(limit), EXPORT_CHUNK_LIMIT)
+        if limit <= 0:
+            raise UserError(_("The number of records of an export chunk must be positive."))
+        for rows, token in self._export_chunks(domain, fields, resume_token, limit):
+            return {
+                'rows': rows,
+                'next_token': token if len(rows) == limit else False,
+            }
+        return {'rows': [], 'next_token': False}
+
+    @api.model
+    def _export_jsonl(self, domain, field_names, file, resume_token=None, chunk_size=1000):
+        """ Write the records matching ``domain`` to the text file ``file``,
+        as one JSON object per line.
+
+        :return: the token of the last chunk written
+        """
+        for rows, resume_token in self._export_chunks(domain, field_names, resume_token, chunk_size):
+            file.writelines(json.dumps(row, default=json_default) + '\n' for row in rows)
+        return resume_token
+
+    @api.model
+    def _export_csv(self, domain, field_names, file, resume_token=None, chunk_size=1000):
+        """ Write the records matching ``domain`` to the text file ``file``
+        as CSV, with a header row unless the export resumes a previous one.
+        The ids of x2many fields are separated by commas.
+
+        :return: the token of the last chunk written
+        """
+        columns = ['id', *(fname for fname in field_names if fname != 'id')]
+        writer = csv.writer(file)
+        if not resume_token:
+            writer.writerow(columns)
+        for rows, resume_token in self._export_chunks(domain, field_names, resume_token, chunk_size):
+            writer.writerows(
+                [self._export_csv_value(fname, row[fname]) for fname in columns]
+                for row in rows
+            )
+        return resume_token
+
+    def _export_csv_value(self, field_name, value):
+        if isinstance(value, list):
+            return ','.join(map(str, value))
+        if value is False and self._fields[field_name].type != 'boolean':
+            return ''
+        return value
+
+    @api.model
+    def _export_attachment(self, domain, field_names, file_format='jsonl', name=None, chunk_size=1000):
+        """ Export the records matching ``domain`` to a new attachment, in
+        the format ``jsonl`` or ``csv``. The records are written to a
+        temporary file as they are exported, so that only the final content
+        of the attachment is held in memory, when the attachment is created
+        from it through its ``raw`` field.
+
+        :return: the attachment
+        """
+        writers = {
+            'jsonl': (self._export_jsonl, 'application/jsonl'),
+            'csv': (self._export_csv, 'text/csv'),
+        }
+        writer, mimetype = writers[file_format]
+        with tempfile.TemporaryFile() as file:
+            text = io.TextIOWrapper(file, encoding='utf-8', newline='')
+            writer(domain, field_names, text, chunk_size=chunk_size)
+            text.flush()
+            text.detach()
+            file.seek(0)
+            return self.env['ir.attachment'].create({
+                'name': name or f'{self._table}.{file_format}',
+                'mimetype': mimetype,
+                'raw': file.read(),
+            })
@@ -1,14 +1,20 @@
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
+import logging
+import psycopg2
 from collections import defaultdict
+from contextlib import contextmanager
 from dateutil.relativedelta import relativedelta
 from datetime import datetime
+from markupsafe import Markup
 
 from odoo import api, fields, models, _
-from odoo.exceptions import UserError
+from odoo.exceptions import UserError, ValidationError
 from odoo.fields import Domain
+from odoo.tools import SQL, split_every
 from odoo.addons.fleet.models.fleet_vehicle_model import FUEL_TYPES
 
+_logger = logging.getLogger(__name__)
 
 #Some fields don't have the exact same name
 MODEL_FIELDS_TO_VEHICLE = {
@@ -19,13 +25,23 @@ MODEL_FIELDS_TO_VEHICLE = {
     'power_unit': 'power_unit', 'range_unit': 'range_unit',
 }
 
+# Vehicles listed by the message logged on a model by coalesced tracking
+COALESCED_TRACKING_LINKS = 20
+
+# Errors of the invalid rows of an onboarding: wrong values, failed constraints
+ONBOARDING_ERRORS = (ValueError, UserError, ValidationError, psycopg2.IntegrityError)
+
 
 class FleetVehicle(models.Model):
     _name = 'fleet.vehicle'
-    _inherit = ['mail.thread', 'mail.activity.mixin', 'avatar.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'avatar.mixin', 'fleet.export.mixin']
     _description = 'Vehicle'
     _order = 'license_plate asc, acquisition_date asc'
-    _rec_names_search = ['name', 'driver_id.name']
+    _rec_names_search = ['name', 'vin_sn', 'driver_id.name']
+
+    _contract_renewal_due_soon_idx = models.Index("(id) WHERE contract_renewal_due_soon IS TRUE")
+    _contract_renewal_overdue_idx = models.Index("(id) WHERE contract_renewal_overdue IS TRUE")
+    _driver_type_idx = models.Index("(driver_id, vehicle_type) WHERE driver_id IS NOT NULL")
 
     def _get_default_state(self):
         state = self.env.ref('fleet.fleet_vehicle_state_new_request', raise_if_not_found=False)
@@ -35,7 +51,7 @@ class FleetVehicle(models.Model):
         current_year = datetime.now().year
         return [(str(i), i) for i in range(1970, current_year + 1)]
 
-    name = fields.Char(compute="_compute_vehicle_name", store=True)
+    name = fields.Char(compute="_compute_vehicle_name", store=True, index='trigram')
     description = fields.Html("Vehicle Description")
     active = fields.Boolean('Active', default=True, tracking=True)
     manager_id = fields.Many2one(
@@ -49,192 +65,348 @@ class FleetVehicle(models.Model):
     currency_id = fields.Many2one('res.currency', related='company_id.currency_id')
     country_id = fields.Many2one('res.country', related='company_id.country_id')
     country_code = fields.Char(related='country_id.code', depends=['country_id'])
-    license_plate = fields.Char(tracking=True,
+    license_plate = fields.Char(tracking=True, index='trigram',
         help='License plate number of the vehicle (i = plate number for a car)')
-    vin_sn = fields.Char('Chassis Number', help='Unique number written on the vehicle motor (VIN/SN number)', tracking=True, copy=False)
+    vin_sn = fields.Char('Chassis Number', help='Unique number written on the vehicle motor (VIN/SN number)', tracking=True, copy=False, index='trigram')
     trailer_hook = fields.Boolean(default=False, string='Trailer Hitch',
-        compute='_compute_trailer_hook', store=True, readonly=False,
+        compute='_compute_model_fields', store=True, readonly=False,
         help="A trailer hitch is a device attached to a vehicle's chassis for towing purposes, \
             such as pulling trailers, boats, or other vehicles.")
     driver_id = fields.Many2one('res.partner', 'Driver', tracking=True, help='Driver address of the vehicle', copy=False)
-    future_driver_id = fields.Many2one('res.partner', 'Future Driver', tracking=True, help='Next Driver Address of the vehicle', copy=False, check_company=True)
+    future_driver_id = fields.Many2one('res.partner', 'Future Driver', tracking=True, help='Next Driver Address of the vehicle', copy=False, check_company=True, index='btree_not_null')
     model_id = fields.Many2one('fleet.vehicle.model', 'Model',
         tracking=True, required=True)
     brand_id = fields.Many2one('fleet.vehicle.model.brand', 'Brand', related="model_id.brand_id", store=True, readonly=False)
     log_drivers = fields.One2many('fleet.vehicle.assignation.log', 'vehicle_id', string='Assignment Logs')
     log_services = fields.One2many('fleet.vehicle.log.services', 'vehicle_id', 'Services Logs')
     log_contracts = fields.One2many('fleet.vehicle.log.contract', 'vehicle_id', 'Contracts')
-    contract_count = fields.Integer(compute="_compute_count_all", string='Contract Count')
-    service_count = fields.Integer(compute="_compute_count_all", string='Services')
-    odometer_count = fields.Integer(compute="_compute_count_all", string='Odometer')
-    history_count = fields.Integer(compute="_compute_count_all", string="Drivers History Count")
+    contract_count = fields.Integer(compute="_compute_count_all", string='Contract Count', store=True)
+    service_count = fields.Integer(compute="_compute_count_all", string='Services', store=True)
+    odometer_count = fields.Integer(compute="_compute_count_all", string='Odometer', store=True)
+    history_count = fields.Integer(compute="_compute_count_all", string="Drivers History Count", store=True)
     next_assignation_date = fields.Date('Assignment Date', help='This is the date at which the car will be available, if not set it means available instantly')
     order_date = fields.Date('Order Date')
     acquisition_date = fields.Date('Registration Date', required=False,
         tracking=True, help='Date of vehicle registration')
     write_off_date = fields.Date('Cancellation Date', tracking=True, help="Date when the vehicle's license plate has been cancelled/removed.")
     contract_date_start = fields.Date(string="First Contract Date", default=fields.Date.today, tracking=True)
-    color = fields.Char(help='Color of the vehicle', compute='_compute_color', store=True, readonly=False)
+    color = fields.Char(help='Color of the vehicle', compute='_compute_model_fields', store=True, readonly=False)
     state_id = fields.Many2one('fleet.vehicle.state', 'State',
         default=_get_default_state, group_expand='_read_group_expand_full',
         tracking=True,
         help='Current state of the vehicle', ondelete="set null")
     location = fields.Char(help='Location of the vehicle (garage, ...)')
     seats = fields.Integer('Seating Capacity', help='Number of seats of the vehicle',
-        compute='_compute_seats', store=True, readonly=False)
+        compute='_compute_model_fields', store=True, readonly=False)
     model_year = fields.Selection(selection='_get_year_selection', string='Model Year',
-        help='Year of the model', compute='_compute_model_year', store=True, readonly=False)
+        help='Year of the model', compute='_compute_model_fields', store=True, readonly=False)
     doors = fields.Integer('Number of Doors', help='Number of doors of the vehicle',
-        compute='_compute_doors', store=True, readonly=False)
+        compute='_compute_model_fields', store=True, readonly=False)
     tag_ids = fields.Many2many('fleet.vehicle.tag', 'fleet_vehicle_vehicle_tag_rel', 'vehicle_tag_id', 'tag_id', 'Tags', copy=False)
     odometer = fields.Float(compute='_get_odometer', inverse='_set_odometer', string='Last Odometer',
         help='Odometer measure of the vehicle at the moment of this log')
+    log_odometers = fields.One2many('fleet.vehicle.odometer', 'vehicle_id', 'Odometer Logs')
+    last_odometer = fields.Float('Last Odometer Reading', compute='_compute_last_odometer', store=True,
+        help='Highest odometer value recorded for the vehicle')
+    last_odometer_date = fields.Date('Last Odometer Date', compute='_compute_last_odometer', store=True,
+        help='Date of the highest odometer value recorded for the vehicle')
     odometer_unit = fields.Selection([
         ('kilometers', 'km'),
         ('miles', 'mi')
         ], 'Odometer Unit', default='kilometers', required=True)
     transmission = fields.Selection(
         [('manual', 'Manual'), ('automatic', 'Automatic')], 'Transmission',
-        compute='_compute_transmission', store=True, readonly=False)
-    fuel_type = fields.Selection(FUEL_TYPES, 'Fuel Type', compute='_compute_fuel_type', store=True, readonly=False)
+        compute='_compute_model_fields', store=True, readonly=False)
+    fuel_type = fields.Selection(FUEL_TYPES, 'Fuel Type', compute='_compute_model_fields', store=True, readonly=False)
     power_unit = fields.Selection([
         ('power', 'kW'),
         ('horsepower', 'Horsepower')
-        ], 'Power Unit', default='power', required=True)
-    horsepower = fields.Float(compute='_compute_horsepower', store=True, readonly=False)
-    horsepower_tax = fields.Float('Horsepower Taxation', compute='_compute_horsepower_tax', store=True, readonly=False)
+        ], 'Power Unit', default='power', required=True,
+        compute='_compute_model_fields', store=True, readonly=False)
+    horsepower = fields.Float(compute='_compute_model_fields', store=True, readonly=False)
+    horsepower_tax = fields.Float('Horsepower Taxation', compute='_compute_model_fields', store=True, readonly=False)
     power = fields.Float('Power', help='Power in kW of the vehicle',
-        compute='_compute_power', store=True, readonly=False)
-    co2 = fields.Float('CO₂ Emissions', help='CO2 emissions of the vehicle', compute='_compute_co2',
+        compute='_compute_model_fields', store=True, readonly=False)
+    co2 = fields.Float('CO₂ Emissions', help='CO2 emissions of the vehicle', compute='_compute_model_fields',
         store=True, readonly=False, tracking=True, aggregator=None)
     co2_emission_unit = fields.Selection([('g/km', 'g/km'), ('g/mi', 'g/mi')], compute='_compute_co2_emission_unit',
         store=True, default="g/km", required=True)
-    co2_standard = fields.Char('Emission Standard', compute='_compute_co2_standard', store=True, readonly=False,
+    co2_standard = fields.Char('Emission Standard', compute='_compute_model_fields', store=True, readonly=False,
         help="Emission Standard specifies the regulatory test procedure \
             or guideline under which a vehicle's emissions are measured.")
-    category_id = fields.Many2one('fleet.vehicle.model.category', 'Category', compute='_compute_category', store=True, readonly=False)
+    category_id = fields.Many2one('fleet.vehicle.model.category', 'Category', compute='_compute_model_fields', store=True, readonly=False)
     image_128 = fields.Image(related='model_id.image_128', readonly=True)
-    contract_renewal_due_soon = fields.Boolean(compute='_compute_contract_reminder', search='_search_contract_renewal_due_soon',
+    contract_renewal_due_soon = fields.Boolean(compute='_compute_contract_reminder', store=True,
         string='Has Contracts to renew')
-    contract_renewal_overdue = fields.Boolean(compute='_compute_contract_reminder', search='_search_get_overdue_contract_reminder',
+    contract_renewal_overdue = fields.Boolean(compute='_compute_contract_reminder', store=True,
         string='Has Contracts Overdue')
     contract_state = fields.Selection(
         [('futur', 'Incoming'),
          ('open', 'In Progress'),
          ('expired', 'Expired'),
          ('closed', 'Closed')
-        ], string='Last Contract State', compute='_compute_contract_reminder', required=False)
+        ], string='Last Contract State', compute='_compute_contract_reminder', store=True, index=True, required=False)
     car_value = fields.Float(string="Catalog Value (VAT Incl.)", tracking=True)
     net_car_value = fields.Float(string="Purchase Value")
     residual_value = fields.Float()
     plan_to_change_car = fields.Boolean(tracking=True)
     plan_to_change_bike = fields.Boolean(tracking=True)
-    vehicle_type = fields.Selection(related='model_id.vehicle_type')
+    vehicle_type = fields.Selection(related='model_id.vehicle_type', store=True, index=True)
     frame_type = fields.Selection([('diamant', 'Diamant'), ('trapez', 'Trapez'), ('wave', 'Wave')], string="Bike Frame Type")
-    electric_assistance = fields.Boolean(compute='_compute_electric_assistance', store=True, readonly=False)
+    electric_assistance = fields.Boolean(compute='_compute_model_fields', store=True, readonly=False)
     frame_size = fields.Float()
     service_activity = fields.Selection([
         ('none', 'None'),
         ('overdue', 'Overdue'),
         ('today', 'Today'),
-    ], compute='_compute_service_activity')
+    ], compute='_compute_service_activity', search='_search_service_activity')
     vehicle_properties = fields.Properties('Properties', definition='model_id.vehicle_properties_definition', copy=True)
-    vehicle_range = fields.Integer(string="Range")
+    vehicle_range = fields.Integer(string="Range", compute='_compute_model_fields', store=True, readonly=False)
     range_unit = fields.Selection([('km', 'km'), ('mi', 'mi')],
-        compute='_compute_range_unit', store=True, readonly=False, default="km", required=True)
+        compute='_compute_model_fields', store=True, readonly=False, default="km", required=True)
 
     @api.depends('log_services')
     def _compute_service_activity(self):
+        """ The worst activity state of the services of each vehicle, computed
+        by the database in one grouped query: 'overdue' when an activity of a
+        service is late, 'today' when one is due today, 'none' otherwise.
+        Only the active activities of active services are considered. """
+        vehicle_ids = [vehicle_id for vehicle_id in self._origin.ids if vehicle_id]
+        service_activity = {}
+        if vehicle_ids:
+            Services = self.env['fleet.vehicle.log.services']
+            Services.flush_model(['vehicle_id', 'active'])
+            self.env['mail.activity'].flush_model(['res_model', 'res_id', 'date_deadline', 'user_id', 'active'])
+            tz = self.env.context.get('tz') or self.env.user.tz or 'UTC'
+            self.env.cr.execute(SQL("""
+                SELECT service.vehicle_id,
+                       MIN(activity.date_deadline - (now() AT TIME ZONE COALESCE(partner.tz, %(tz)s))::date)
+                  FROM mail_activity activity
+                  JOIN fleet_vehicle_log_services service ON service.id = activity.res_id
+             LEFT JOIN res_users users ON users.id = activity.user_id
+             LEFT JOIN res_partner partner ON partner.id = users.partner_id
+                 WHERE activity.res_model = %(res_model)s
+                   AND activity.active
+                   AND service.active
+                   AND service.vehicle_id = ANY(%(vehicle_ids)s)
+              GROUP BY service.vehicle_id
+            """, tz=tz, vehicle_ids=vehicle_ids, res_model=Services._name))
+            service_activity = {
+                vehicle_id: 'overdue' if days_left < 0 else 'today'
+                for vehicle_id, days_left in self.env.cr.fetchall()
+                if days_left <= 0
+            }
         for vehicle in self:
-            activities_state = set(state for state in vehicle.log_services.mapped('activity_state') if state and state != 'planned')
-            vehicle.service_activity = sorted(activities_state)[0] if activities_state else 'none'
+            vehicle.service_activity = service_activity.get(vehicle._origin.id, 'none')
+
+    def _search_service_activity(self, operator, value):
+        if operator != 'in':
+            return NotImplemented
+        overdue = Domain('log_services', 'any', [('activity_state', '=', 'overdue')])
+        today = Domain('log_services', 'any', [('activity_state', '=', 'today')])
+        domains = []
+        if 'overdue' in value:
+            domains.append(overdue)
+        if 'today' in value:
+            domains.append(today & ~overdue)
+        if 'none' in value:
+            domains.append(~overdue & ~today)
+        return Domain.OR(domains)
+
+    @api.model
+    def _get_model_fields_to_vehicle(self):
+        """ Return the mapping ``{model field: vehicle field}`` of the
+        specifications copied from the model to its vehicles.
+
+        Submodules register extra specifications by extending the result; the
+        vehicle fields they add must use ``_compute_model_fields`` as compute
+        method so that every specification is filled in the same pass.
+        """
+        return dict(MODEL_FIELDS_TO_VEHICLE)
+
+    @api.model
+    def _get_model_specifications(self, vehicle_models, fields_to_load=None):
+        """ Return the values to copy from each model onto its vehicles, in
+        the format of :meth:`write`. Only truthy values of the models are
+        returned, so that they never erase a value set on the vehicle.
+
+        :param vehicle_models: ``fleet.vehicle.model`` records
+        :param fields_to_load: vehicle fields to consider, all the registered
+            specifications by default
+        :return: a dict ``{model_id: {vehicle_field: value}}``
+        """
+        mapping = {
+            model_field: vehicle_field
+            for model_field, vehicle_field in self._get_model_fields_to_vehicle().items()
+            if fields_to_load is None or vehicle_field in fields_to_load
+        }
+        specifications = {}
+        for model in vehicle_models:
+            specifications[model.id] = {
+                vehicle_field: model._fields[model_field].convert_to_write(model[model_field], model)
+                for model_field, vehicle_field in mapping.items()
+                if model[model_field]
+            }
+        return specifications
 
-    def _load_fields_from_model(self, fields_to_load):
+    def _load_fields_from_model(self, fields_to_load=None):
         '''
         Copies the desired fields from the models to the vehicles
         '''
-        model_values = dict()
-        for vehicle in self.filtered('model_id'):
-            if vehicle.model_id.id in model_values:
-                write_vals = model_values[vehicle.model_id.id]
-            else:
-                # Update only the desired fields from the model, only when the model has a truthy value.
-                write_vals = \
-                    {
-                        vehicle_field: vehicle.model_id[model_field] for model_field, vehicle_field in MODEL_FIELDS_TO_VEHICLE.items()
-                        if vehicle_field in fields_to_load and vehicle.model_id[model_field]
-                    }
-                model_values[vehicle.model_id.id] = write_vals
-            vehicle.update(write_vals)
-
-    @api.depends('model_id')
-    def _compute_category(self):
-        self._load_fields_from_model(['category_id'])
-
-    @api.depends('model_id')
-    def _compute_range_unit(self):
-        self._load_fields_from_model(['range_unit'])
-
-    @api.depends('model_id')
-    def _compute_trailer_hook(self):
-        self._load_fields_from_model(['trailer_hook'])
-
-    @api.depends('model_id')
-    def _compute_vehicle_range(self):
-        self._load_fields_from_model(['vehicle_range'])
-
-    @api.depends('model_id')
-    def _compute_electric_assistance(self):
-        self._load_fields_from_model(['electric_assistance'])
-
-    @api.depends('model_id')
-    def _compute_co2_standard(self):
-        self._load_fields_from_model(['co2_standard'])
-
-    @api.depends('model_id')
-    def _compute_co2(self):
-        self._load_fields_from_model(['co2'])
-
-    @api.depends('model_id')
-    def _compute_power(self):
-        self._load_fields_from_model(['power'])
-
-    @api.depends('model_id')
-    def _compute_horsepower(self):
-        self._load_fields_from_model(['horsepower'])
-
-    @api.depends('model_id')
-    def _compute_horsepower_tax(self):
-        self._load_fields_from_model(['horsepower_tax'])
-
-    @api.depends('model_id')
-    def _compute_fuel_type(self):
-        self._load_fields_from_model(['fuel_type'])
+        vehicles_by_model = self.filtered('model_id').grouped('model_id')
+        specifications = self._get_model_specifications(self.model_id, fields_to_load)
+        for model, vehicles in vehicles_by_model.items():
+            vehicles.update(specifications[model.id])
+
+    def _add_model_specifications(self, vals_list):
+        """ Complete ``vals_list`` in place with the specifications of the
+        models they refer to, without overriding the given values.
+
+        All the fields computed by ``_compute_model_fields`` are protected as
+        soon as one of them is written, hence the values are provided up front
+        rather than computed after the fact.
+        """
+        model_ids = {vals['model_id'] for vals in vals_list if vals.get('model_id')}
+        if not model_ids:
+            return
+        vehicle_models = self.env['fleet.vehicle.model'].browse(model_ids)
+        specifications = self._get_model_specifications(vehicle_models)
+        for vals in vals_list:
+            for fname, value in specifications.get(vals.get('model_id'), {}).items():
+                vals.setdefault(fname, value)
 
     @api.depends('model_id')
-    def _compute_transmission(self):
-        self._load_fields_from_model(['transmission'])
+    def _compute_model_fields(self):
+        self._load_fields_from_model()
+
+    @api.model
+    def _get_tracking_groups(self):
+        """ Return the groups of tracked fields recomputed from the models of
+        the vehicles, as a dict ``{group: field names}``.
+
+        When the ``fleet_coalesce_tracking`` context key is set, as done by
+        the writes on models, the tracking of those recomputations is
+        coalesced according to the ``fleet.tracking_coalesce.<group>``
+        parameter: ``vehicle`` (default)
+        logs one message per vehicle, all messages and tracking values being
+        created in bulk; ``model`` logs one message on each model, listing its
+        updated vehicles; ``off`` tracks each vehicle on its own as usual.
+        """
+        return {'specifications': list(self._get_model_fields_to_vehicle().values())}
 
-    @api.depends('model_id')
-    def _compute_doors(self):
-        self._load_fields_from_model(['doors'])
+    @api.model
+    def _get_coalesced_tracking_modes(self):
+        """ Return the coalescing mode of the coalesced tracked fields, as a
+        dict ``{field name: mode}``. """
+        params = self.env['ir.config_parameter'].sudo()
+        tracked_fnames = self._track_get_fields()
+        modes = {}
+        for group, fnames in self._get_tracking_groups().items():
+            mode = params.get_param(f'fleet.tracking_coalesce.{group}', 'vehicle')
+            if mode in ('vehicle', 'model'):
+                modes.update(dict.fromkeys(tracked_fnames.intersection(fnames), mode))
+        return modes
+
+    def _compute_field_value(self, field):
+        context = self.env.context
+        if not context.get('fleet_coalesce_tracking') or context.get('tracking_disable') or context.get('mail_notrack'):
+            return super()._compute_field_value(field)
+        if not any(field.name in fnames for fnames in self._get_tracking_groups().values()):
+            return super()._compute_field_value(field)
+        modes = self._get_coalesced_tracking_modes()
+        fnames = [f.name for f in self.pool.field_computed[field] if f.store]
+        if not any(fname in modes for fname in fnames):
+            return super()._compute_field_value(field)
+        self._track_prepare([fname for fname in fnames if fname not in modes])
+        self._coalesced_track_prepare([fname for fname in fnames if fname in modes])
+        return super(FleetVehicle, self.with_context(mail_notrack=True))._compute_field_value(field)
+
+    def _coalesced_track_prepare(self, fnames):
+        """ Same as ``_track_prepare``, the tracking being finalized by
+        ``_coalesced_track_finalize``. """
+        self.env.cr.precommit.add(self.browse()._coalesced_track_finalize)
+        initial_values = self.env.cr.precommit.data.setdefault('fleet.tracking.coalesced', {})
+        for record in self:
+            if not record.id:
+                continue
+            values = initial_values.setdefault(record.id, {})
+            for fname in fnames:
+                values.setdefault(fname, record[fname])
+
+    @api.model
+    def _coalesced_track_finalize(self):
+        initial_values = self.env.cr.precommit.data.pop('fleet.tracking.coalesced', {})
+        vehicles = self.browse([vehicle_id for vehicle_id, values in initial_values.items() if values]).exists().sudo()
+        if not vehicles:
+            return
+        modes = self._get_coalesced_tracking_modes()
+        tracked_fields = vehicles.fields_get(
+            {fname for values in initial_values.values() for fname in values},
+            attributes=('string', 'type', 'selection', 'currency_field'),
+        )
+        for mode in ('vehicle', 'model'):
+            mode_fields = {fname: info for fname, info in tracked_fields.items() if modes.get(fname) == mode}
+            if not mode_fields:
+                continue
+            tracking = {}
+            for vehicle in vehicles:
+                changes, tracking_value_ids = vehicle._mail_track(mode_fields, initial_values[vehicle.id])
+                if changes:
+                    tracking[vehicle.id] = (changes, tracking_value_ids)
+            if mode == 'vehicle':
+                vehicles.browse(list(tracking))._coalesced_track_log_vehicles(tracking)
+            else:
+                vehicles.browse(list(tracking))._coalesced_track_log_models(tracking, mode_fields)
+        self.env.flush_all()
+
+    def _coalesced_track_log_vehicles(self, tracking):
+        messages = self._message_log_batch(dict.fromkeys(self.ids, _("Specifications updated from the model.")))
+        self.env['mail.tracking.value'].sudo().create([
+            dict(command[2], mail_message_id=message.id)
+            for message in messages
+            for command in tracking[message.res_id][1]
+        ])
 
-    @api.depends('model_id')
-    def _compute_model_year(self):
-        self._load_fields_from_model(['model_year'])
+    def _coalesced_track_log_models(self, tracking, tracked_fields):
+        for model, vehicles in self.filtered('model_id').grouped('model_id').items():
+            fnames = set().union(*(tracking[vehicle.id][0] for vehicle in vehicles))
+            links = Markup().join(
+                Markup("<li>%s</li>") % vehicle._get_html_link() for vehicle in vehicles[:COALESCED_TRACKING_LINKS]
+            )
+            if len(vehicles) > COALESCED_TRACKING_LINKS:
+                links += Markup("<li>%s</li>") % _("and %s other vehicles", len(vehicles) - COALESCED_TRACKING_LINKS)
+            body = Markup("<p>%s</p><ul>%s</ul>") % (
+                _(
+                    "%(fields)s updated on %(count)s vehicles:",
+                    fields=", ".join(tracked_fields[fname]['string'] for fname in sorted(fnames)),
+                    count=len(vehicles),
+                ),
+                links,
+            )
+            model.sudo()._message_log(body=body)
 
-    @api.depends('model_id')
-    def _compute_seats(self):
-        self._load_fields_from_model(['seats'])
+    def init(self):
+        self.env.cr.execute("""
+            CREATE TABLE IF NOT EXISTS fleet_vehicle_name_queue (
+                vehicle_id INTEGER PRIMARY KEY REFERENCES fleet_vehicle ON DELETE CASCADE
+            )
+        """)
 
-    @api.depends('model_id')
-    def _compute_color(self):
-        self._load_fields_from_model(['color'])
+    def _get_vehicle_name(self):
+        self.ensure_one()
+        return (self.model_id.brand_id.name or '') + '/' + (self.model_id.name or '') + '/' + (self.license_plate or _('No Plate'))
 
     @api.depends('model_id.brand_id.name', 'model_id.name', 'license_plate')
     def _compute_vehicle_name(self):
         for record in self:
-            record.name = (record.model_id.brand_id.name or '') + '/' + (record.model_id.name or '') + '/' + (record.license_plate or _('No Plate'))
+            record.name = record._get_vehicle_name()
+
+    @api.depends('model_id.brand_id.name', 'model_id.name', 'license_plate')
+    def _compute_display_name(self):
+        # computed from the model rather than read from the stored name, which
+        # is outdated until a deferred rename has been processed
+        for record in self:
+            record.display_name = record._get_vehicle_name()
 
     @api.depends('range_unit')
     def _compute_co2_emission_unit(self):
@@ -244,14 +416,35 @@ class FleetVehicle(models.Model):
             else:
                 record.co2_emission_unit = 'g/mi'
 
+    @api.depends('log_odometers.value', 'log_odometers.date')
+    def _compute_last_odometer(self):
+        last_odometers = self._read_last_odometer()
+        for record in self:
+            record.last_odometer, record.last_odometer_date = last_odometers.get(record._origin.id, (0, False))
+
+    def _read_last_odometer(self):
+        """ Return the highest odometer reading of every vehicle in ``self``,
+        resolved with a single grouped query whatever the size of the recordset.
+
+        :return: a dict ``{vehicle_id: (value, date)}``; vehicles without any
+            reading are missing from the result
+        """
+        vehicle_ids = [vehicle_id for vehicle_id in self._origin.ids if vehicle_id]
+        if not vehicle_ids:
+            return {}
+        self.env['fleet.vehicle.odometer'].flush_model(['vehicle_id', 'value', 'date'])
+        self.env.cr.execute(SQL("""
+            SELECT DISTINCT ON (vehicle_id) vehicle_id, value, date
+              FROM fleet_vehicle_odometer
+             WHERE vehicle_id = ANY(%s)
+          ORDER BY vehicle_id, value DESC NULLS LAST, date DESC NULLS LAST
+        """, vehicle_ids))
+        return {vehicle_id: (value or 0, date) for vehicle_id, value, date in self.env.cr.fetchall()}
+
+    @api.depends('last_odometer')
     def _get_odometer(self):
-        FleetVehicalOdometer = self.env['fleet.vehicle.odometer']
         for record in self:
-            vehicle_odometer = FleetVehicalOdometer.search([('vehicle_id', 'in', record.ids)], limit=1, order='value desc')
-            if vehicle_odometer:
-                record.odometer = vehicle_odometer.value
-            else:
-                record.odometer = 0
+            record.odometer = record.last_odometer
 
     def _set_odometer(self):
         self.env['fleet.vehicle.odometer'].create([
@@ -263,6 +456,7 @@ class FleetVehicle(models.Model):
             } for vehicle in self if vehicle.odometer
         ])
 
+    @api.depends('active', 'log_odometers', 'log_drivers', 'log_services.active', 'log_contracts.active', 'log_contracts.state')
     def _compute_count_all(self):
         Odometer = self.env['fleet.vehicle.odometer']
         LogService = self.env['fleet.vehicle.log.services'].with_context(active_test=False)
@@ -293,7 +487,60 @@ class FleetVehicle(models.Model):
             vehicle.contract_count = mapped_log_data[vehicle.id][vehicle.active]
             vehicle.history_count = mapped_history_data[vehicle.id]
 
-    @api.depends('log_contracts')
+    @api.model
+    def _repair_count_all(self):
+        """ Rebuild the counters of every vehicle from the logs in one
+        set-based query, e.g. after logs were imported or deleted in SQL.
+
+        :return: the number of vehicles whose counters were wrong
+        """
+        self.check_access('write')
+        self.env.flush_all()
+        self.env.cr.execute(SQL("""
+            WITH odometers AS (
+                SELECT vehicle_id, COUNT(*) AS count
+                  FROM fleet_vehicle_odometer
+              GROUP BY vehicle_id
+            ), services AS (
+                SELECT vehicle_id, active, COUNT(*) AS count
+                  FROM fleet_vehicle_log_services
+              GROUP BY vehicle_id, active
+            ), contracts AS (
+                SELECT vehicle_id, active, COUNT(*) AS count
+                  FROM fleet_vehicle_log_contract
+                 WHERE state IS DISTINCT FROM 'closed'
+              GROUP BY vehicle_id, active
+            ), histories AS (
+                SELECT vehicle_id, COUNT(*) AS count
+                  FROM fleet_vehicle_assignation_log
+              GROUP BY vehicle_id
+            ), counters AS (
+                SELECT vehicle.id AS vehicle_id,
+                       COALESCE(odometers.count, 0) AS odometer_count,
+                       COALESCE(services.count, 0) AS service_count,
+                       COALESCE(contracts.count, 0) AS contract_count,
+                       COALESCE(histories.count, 0) AS history_count
+                  FROM fleet_vehicle vehicle
+             LEFT JOIN odometers ON odometers.vehicle_id = vehicle.id
+             LEFT JOIN services ON services.vehicle_id = vehicle.id AND services.active = vehicle.active
+             LEFT JOIN contracts ON contracts.vehicle_id = vehicle.id AND contracts.active = vehicle.active
+             LEFT JOIN histories ON histories.vehicle_id = vehicle.id
+            )
+            UPDATE fleet_vehicle vehicle
+               SET odometer_count = counters.odometer_count,
+                   service_count = counters.service_count,
+                   contract_count = counters.contract_count,
+                   history_count = counters.history_count
+              FROM counters
+             WHERE counters.vehicle_id = vehicle.id
+               AND (vehicle.odometer_count, vehicle.service_count, vehicle.contract_count, vehicle.history_count)
+                   IS DISTINCT FROM
+                   (counters.odometer_count, counters.service_count, counters.contract_count, counters.history_count)
+        """))
+        self.invalidate_model(['odometer_count', 'service_count', 'contract_count', 'history_count'])
+        return self.env.cr.rowcount
+
+    @api.depends('log_contracts.expiration_date', 'log_contracts.state', 'log_contracts.active')
     def _compute_contract_reminder(self):
         params = self.env['ir.config_parameter'].sudo()
         delay_alert_contract = int(params.get_param('hr_fleet.delay_alert_contract', default=30))
@@ -331,53 +578,54 @@ class FleetVehicle(models.Model):
         # This function is used in fleet_account and is overrided in l10n_be_hr_payroll_fleet
         return self.license_plate or _('No plate')
 
-    def _search_contract_renewal_due_soon(self, operator, value):
-        if operator != 'in':
-            return NotImplemented
+    def _recompute_contract_reminder(self):
+        """ Recompute the stored contract reminder of the vehicles in batches. """
+        fnames = ['contract_renewal_due_soon', 'contract_renewal_overdue', 'contract_state']
+        for ids in split_every(1000, self.ids):
+            vehicles = self.browse(ids)
+            for fname in fnames:
+                self.env.add_to_compute(self._fields[fname], vehicles)
+            vehicles.flush_recordset(fnames)
+            self.env.invalidate_all()
+
+    @api.model
+    def _cron_refresh_contract_reminder(self):
+        """ Daily job recomputing the contract reminder of the vehicles whose
+        status changes with the date only, i.e. whose latest contract expires
+        between the last refresh and the end of the alert delay. """
         params = self.env['ir.config_parameter'].sudo()
         delay_alert_contract = int(params.get_param('hr_fleet.delay_alert_contract', default=30))
         today = fields.Date.context_today(self)
-        datetime_today = fields.Datetime.from_string(today)
-        limit_date = fields.Datetime.to_string(datetime_today + relativedelta(days=+delay_alert_contract))
-        return [('log_contracts', 'any', [
-            ('expiration_date', '>', today),
-            ('expiration_date', '<', limit_date),
-            ('state', 'in', ['open', 'expired']),
-        ])]
-
-    def _search_get_overdue_contract_reminder(self, operator, value):
-        if operator != 'in':
-            return NotImplemented
-        today = fields.Date.context_today(self)
-        # get the id of vehicles that have overdue contracts
-        # but exclude those for which a new contract has already been created for them
-        return [
-            ("log_contracts", "any", [
-                ('expiration_date', '!=', False),
-                ('expiration_date', '<', today),
-                ('state', 'in', ['open', 'expired'])
-            ]),
-            "!",
-                ("log_contracts", "any", [
-                    ('expiration_date', '!=', False),
-                    ('expiration_date', '>=', today),
-                    ('state', 'in', ['open', 'futur'])
-                ]),
-        ]
+        last_refresh = fields.Date.to_date(params.get_param('fleet.contract_reminder_refresh_date')) \
+            or today - relativedelta(days=1)
+        vehicles = self.with_context(active_test=False).search([('log_contracts', 'any', [
+            ('expiration_date', '>=', min(last_refresh, today)),
+            ('expiration_date', '<=', today + relativedelta(days=delay_alert_contract)),
+            ('state', '!=', 'closed'),
+        ])])
+        vehicles._recompute_contract_reminder()
+        params.set_param('fleet.contract_reminder_refresh_date', fields.Date.to_string(today))
 
     @api.model_create_multi
     def create(self, vals_list):
         to_update_drivers_cars = set()
         to_update_drivers_bikes = set()
         state_waiting_list = self.env.ref('fleet.fleet_vehicle_state_waiting_list', raise_if_not_found=False)
+        models_type = {
+            model.id: model.vehicle_type
+            for model in self.env['fleet.vehicle.model'].browse({
+                vals['model_id'] for vals in vals_list if vals.get('future_driver_id') and vals.get('model_id')
+            })
+        }
         for vals in vals_list:
             if vals.get('future_driver_id'):
                 state_id = vals.get('state_id')
                 if not state_waiting_list or state_waiting_list.id != state_id:
                     future_driver = vals['future_driver_id']
-                    if vals.get('vehicle_type') == 'bike':
+                    vehicle_type = vals.get('vehicle_type') or models_type.get(vals.get('model_id'))
+                    if vehicle_type == 'bike':
                         to_update_drivers_bikes.add(future_driver)
-                    elif vals.get('vehicle_type') == 'car':
+                    elif vehicle_type == 'car':
                         to_update_drivers_cars.add(future_driver)
         if to_update_drivers_cars:
             self.search([
@@ -390,26 +638,124 @@ class FleetVehicle(models.Model):
                 ('vehicle_type', '=', 'bike'),
             ]).plan_to_change_bike = True
 
+        self._add_model_specifications(vals_list)
         vehicles = super().create(vals_list)
 
-        for vehicle, vals in zip(vehicles, vals_list):
-            if vals.get('driver_id'):
-                vehicle.create_driver_history(vals)
+        self.env['fleet.vehicle.assignation.log'].create([
+            vehicle._get_driver_history_data(vals)
+            for vehicle, vals in zip(vehicles, vals_list)
+            if vals.get('driver_id')
+        ])
+        vehicles._enqueue_cost_report_refresh()
         return vehicles
 
+    @api.model
+    def _onboard_vehicles(self, rows, chunk_size=1000, create_missing=False):
+        """ Create vehicles in bulk, e.g. when importing a leasing portfolio.
+
+        The rows are processed by chunks of ``chunk_size``, each chunk being
+        created by a single :meth:`create`. Their models are resolved in bulk
+        from the names given by the ``brand`` and ``model`` keys, unless they
+        provide a ``model_id``; unknown brands and models are created when
+        ``create_missing`` is set. The vehicles are created without chatter,
+        one summary message being logged on each model instead.
+
+        Invalid rows are reported without aborting the others: when a chunk
+        fails, its rows are created one by one.
+
+        :param rows: an iterable of dicts of vehicle values
+        :return: a dict with the created ``vehicles`` and the ``errors``, as a
+            list of ``(row index, message)``
+        """
+        Vehicle = self.with_context(
+            tracking_disable=True, mail_create_nolog=True, mail_create_nosubscribe=True, mail_notrack=True,
+        )
+        vehicle_ids = []
+        errors = []
+        for chunk in split_every(chunk_size, enumerate(rows)):
+            vals_by_index = self._onboarding_resolve_models(dict(chunk), errors, create_missing)
+            vehicle_ids.extend(Vehicle._onboarding_create(vals_by_index, errors))
+        vehicles = self.browse(vehicle_ids)
+        for model, model_vehicles in vehicles.grouped('model_id').items():
+            model._message_log(body=_("%s vehicles onboarded.", len(model_vehicles)))
+        return {'vehicles': vehicles, 'errors': sorted(errors)}
+
+    @api.model
+    def _onboarding_resolve_models(self, rows, errors, create_missing=False):
+        """ Return the vehicle values of the given ``{index: row}``, with the
+        ``model_id`` of the brand and model they name. Rows whose model is
+        unknown are reported in ``errors``. """
+        Brand = self.env['fleet.vehicle.model.brand']
+        Model = self.env['fleet.vehicle.model']
+        names = {
+            (row.get('brand'), row.get('model'))
+            for row in rows.values() if not row.get('model_id') and row.get('brand') and row.get('model')
+        }
+        brand_names = {brand_name for brand_name, _model_name in names}
+        brand_ids = {}
+        for brand in Brand.search_fetch([('name', 'in', list(brand_names))], ['name'], order='id desc'):
+            brand_ids[brand.name] = brand.id
+        if create_missing and brand_names - brand_ids.keys():
+            missing = sorted(brand_names - brand_ids.keys())
+            brand_ids.update(zip(missing, Brand.create([{'name': name} for name in missing]).ids))
+
+        model_ids = {}
+        for model in Model.search_fetch([
+            ('brand_id', 'in', list(brand_ids.values())),
+            ('name', 'in', list({model_name for _brand_name, model_name in names})),
+        ], ['name', 'brand_id'], order='id desc'):
+            model_ids[model.brand_id.id, model.name] = model.id
+        if create_missing:
+            missing = sorted(
+                (brand_ids[brand_name], model_name) for brand_name, model_name in names
+                if brand_name in brand_ids and (brand_ids[brand_name], model_name) not in model_ids
+            )
+            model_ids.update(zip(missing, Model.create([
+                {'brand_id': brand_id, 'name': model_name} for brand_id, model_name in missing
+            ]).ids))
+
+        vals_by_index = {}
+        for index, row in rows.items():
+            vals = {fname: value for fname, value in row.items() if fname not in ('brand', 'model')}
+            if not vals.get('model_id'):
+                vals['model_id'] = model_ids.get((brand_ids.get(row.get('brand')), row.get('model')))
+                if not vals['model_id']:
+                    errors.append((index, _("Unknown model %(brand)s/%(model)s", brand=row.get('brand'), model=row.get('model'))))
+                    continue
+            vals_by_index[index] = vals
+        return vals_by_index
+
+    @api.model
+    def _onboarding_create(self, vals_by_index, errors):
+        """ Create the vehicles of the given ``{index: vals}`` at once, or one
+        by one when that fails, and return their ids. The errors of the rows
+        are added to ``errors``. """
+        if len(vals_by_index) > 1:
+            try:
+                with self.env.cr.savepoint():
+                    return self.create(list(vals_by_index.values())).ids
+            except ONBOARDING_ERRORS:
+                # create the rows one by one to find the invalid ones
+                pass
+        vehicle_ids = []
+        for index, vals in vals_by_index.items():
+            try:
+                with self.env.cr.savepoint():
+                    vehicle_ids.append(self.create(vals).id)
+            except ONBOARDING_ERRORS as e:
+                errors.append((index, str(e)))
+        return vehicle_ids
+
     def write(self, vals):
+        if vals.get('model_id') and not set(self._get_model_fields_to_vehicle().values()).isdisjoint(vals):
+            vals = dict(vals)
+            self._add_model_specifications([vals])
+
         if 'odometer' in vals and any(vehicle.odometer > vals['odometer'] for vehicle in self):
             raise UserError(_('The odometer value cannot be lower than the previous one.'))
 
-        if 'driver_id' in vals and vals['driver_id']:
-            driver_id = vals['driver_id']
-            for vehicle in self.filtered(lambda v: v.driver_id.id != driver_id):
-                vehicle.create_driver_history(vals)
-                if vehicle.driver_id:
-                    vehicle.activity_schedule(
-                        'mail.mail_activity_data_todo',
-                        user_id=vehicle.manager_id.id or self.env.user.id,
-                        note=_('Specify the End date of %s', vehicle.driver_id.name))
+        if 'driver_id' in vals and vals['driver_id'] and not self.env.context.get('fleet_driver_changes_logged'):
+            self._log_driver_changes(dict.fromkeys(self.ids, vals['driver_id']))
 
         if 'future_driver_id' in vals and vals['future_driver_id']:
             future_driver = vals['future_driver_id']
@@ -433,8 +779,83 @@ class FleetVehicle(models.Model):
             self.env['fleet.vehicle.log.services'].search([('vehicle_id', 'in', self.ids)]).active = False
 
         res = super(FleetVehicle, self).write(vals)
+        if not {
+            'name', 'license_plate', 'model_id', 'driver_id', 'company_id', 'fuel_type', 'active', 'acquisition_date',
+        }.isdisjoint(vals):
+            self._enqueue_cost_report_refresh()
+        if 'acquisition_date' in vals:
+            self._enqueue_odometer_report_refresh()
         return res
 
+    def _enqueue_cost_report_refresh(self):
+        self.env['fleet.vehicle.cost.report']._enqueue_refresh([(vehicle_id, None, None) for vehicle_id in self.ids])
+
+    def _enqueue_odometer_report_refresh(self):
+        self.env['fleet.vehicle.odometer.report']._enqueue_refresh([(vehicle_id, None, None) for vehicle_id in self.ids])
+
+    @contextmanager
+    def _defer_name_cascade(self):
+        """ Context manager deferring the recomputation of the names of the
+        vehicles and of their contracts, when renaming their brand or model
+        would rewrite more vehicles than ``fleet.name_cascade_threshold``. The
+        names are then recomputed in batches by ``_process_name_queue()``. """
+        threshold = int(self.env['ir.config_parameter'].sudo().get_param('fleet.name_cascade_threshold', default=1000))
+        if len(self) <= threshold:
+            yield
+            return
+        contracts = self.env['fleet.vehicle.log.contract'].with_context(active_test=False).search([('vehicle_id', 'in', self.ids)])
+        with self.env.protecting([self._fields['name']], self), \
+                self.env.protecting([contracts._fields['name']], contracts):
+            yield
+        self._enqueue_name_refresh()
+
+    def _enqueue_name_refresh(self):
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO fleet_vehicle_name_queue (vehicle_id)
+                 SELECT unnest(%s::int[])
+            ON CONFLICT DO NOTHING
+            """,
+            self.ids,
+        ))
+        cron = self.env.ref('fleet.ir_cron_fleet_vehicle_name_refresh', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    @api.model
+    def _process_name_queue(self, batch_size=1000):
+        """ Recompute the names of the queued vehicles and of their contracts,
+        ``batch_size`` vehicles at a time, committing after each batch. """
+        Contract = self.env['fleet.vehicle.log.contract'].with_context(active_test=False)
+        while True:
+            self.env.cr.execute(SQL(
+                """
+                DELETE FROM fleet_vehicle_name_queue
+                      WHERE vehicle_id IN (
+                                SELECT vehicle_id
+                                  FROM fleet_vehicle_name_queue
+                              ORDER BY vehicle_id
+                                 LIMIT %s
+                                   FOR UPDATE SKIP LOCKED
+                            )
+                  RETURNING vehicle_id
+                """,
+                batch_size,
+            ))
+            vehicles = self.browse([vehicle_id for vehicle_id, in self.env.cr.fetchall()])
+            if not vehicles:
+                return
+            contracts = Contract.search([('vehicle_id', 'in', vehicles.ids)])
+            self.env.add_to_compute(self._fields['name'], vehicles)
+            self.env.add_to_compute(Contract._fields['name'], contracts)
+            # the names are written by one UPDATE per batch when flushing
+            self.env.flush_all()
+            vehicles._enqueue_cost_report_refresh()
+            self.env.invalidate_all()
+            _logger.info("fleet: renamed %s vehicles and %s contracts", len(vehicles), len(contracts))
+            if not self.env['ir.cron']._commit_progress(len(vehicles)):
+                return
+
     def _get_driver_history_data(self, vals):
         self.ensure_one()
         return {
@@ -443,27 +864,89 @@ class FleetVehicle(models.Model):
             'date_start': fields.Date.today(),
         }
 
+    def _log_driver_changes(self, driver_ids, close_history=False):
+        """ Log the assignment of the driver ``driver_ids[vehicle.id]`` to each
+        vehicle, before it is written: the assignation logs of the new drivers
+        are created at once, as well as the activities asking the managers to
+        specify the end date of the former drivers.
+
+        :param driver_ids: a dict ``{vehicle_id: driver_id or False}``
+        :param close_history: whether to end the open assignation logs of the
+            former drivers today
+        """
+        changed = self.filtered(lambda vehicle: vehicle.driver_id.id != (driver_ids.get(vehicle.id) or False))
+        former = changed.filtered('driver_id')
+        if close_history:
+            former._close_driver_history()
+        self.env['fleet.vehicle.assignation.log'].create([
+            vehicle._get_driver_history_data({'driver_id': driver_ids[vehicle.id]})
+            for vehicle in changed
+            if driver_ids[vehicle.id]
+        ])
+        if former:
+            activity_type = self.env.ref('mail.mail_activity_data_todo')
+            res_model_id = self.env['ir.model']._get_id(self._name)
+            date_deadline = activity_type._get_date_deadline()
+            self.env['mail.activity'].create([{
+                'activity_type_id': activity_type.id,
+                'summary': activity_type.summary or '',
+                'note': _('Specify the End date of %s', vehicle.driver_id.name),
+                'automated': True,
+                'date_deadline': date_deadline,
+                'res_model_id': res_model_id,
+                'res_id': vehicle.id,
+                'user_id': vehicle.manager_id.id or self.env.user.id,
+            } for vehicle in former])
+
+    def _close_driver_history(self):
+        """ End the open assignation logs of the vehicles today. """
+        Log = self.env['fleet.vehicle.assignation.log']
+        Log.flush_model(['vehicle_id', 'date_end'])
+        self.env.cr.execute(SQL(
+            """
+            UPDATE fleet_vehicle_assignation_log
+               SET date_end = %s, write_date = NOW() AT TIME ZONE 'UTC', write_uid = %s
+             WHERE vehicle_id = ANY(%s)
+               AND date_end IS NULL
+            """,
+            fields.Date.today(), self.env.uid, self.ids,
+        ))
+        Log.invalidate_model(['date_end', 'write_date', 'write_uid'])
+
     def create_driver_history(self, vals):
-        for vehicle in self:
-            self.env['fleet.vehicle.assignation.log'].create(
-                vehicle._get_driver_history_data(vals),
-            )
+        self.env['fleet.vehicle.assignation.log'].create([
+            vehicle._get_driver_history_data(vals) for vehicle in self
+        ])
 
     def action_accept_driver_change(self):
         # Find all the vehicles of the same type for which the driver is the future_driver_id
         # remove their driver_id and close their history using current date
-        vehicles = self.search([('driver_id', 'in', self.mapped('future_driver_id').ids), ('vehicle_type', '=', self.vehicle_type)])
+        future_drivers = {(vehicle.future_driver_id.id, vehicle.vehicle_type) for vehicle in self if vehicle.future_driver_id}
+        vehicles = self.search([
+            ('driver_id', 'in', [driver_id for driver_id, _vehicle_type in future_drivers]),
+            ('vehicle_type', 'in', [vehicle_type for _driver_id, vehicle_type in future_drivers]),
+            ('id', 'not in', self.ids),
+        ]).filtered(lambda vehicle: (vehicle.driver_id.id, vehicle.vehicle_type) in future_drivers)
+        vehicles._close_driver_history()
         vehicles.write({
             'driver_id': False,
             'plan_to_change_car': False,
             'plan_to_change_bike': False,
         })
-        
-        for vehicle in self:
-            vehicle.plan_to_change_bike = False
-            vehicle.plan_to_change_car = False
-            vehicle.driver_id = vehicle.future_driver_id
-            vehicle.future_driver_id = False
+
+        # the driver changes are logged at once, hence not by write(); like
+        # write(), vehicles left without driver are not logged
+        with_future_driver = self.filtered('future_driver_id')
+        with_future_driver._log_driver_changes(
+            {vehicle.id: vehicle.future_driver_id.id for vehicle in with_future_driver}, close_history=True,
+        )
+        for future_driver, vehicles in self.with_context(fleet_driver_changes_logged=True).grouped('future_driver_id').items():
+            vehicles.write({
+                'driver_id': future_driver.id,
+                'future_driver_id': False,
+                'plan_to_change_car': False,
+                'plan_to_change_bike': False,
+            })
 
     def return_action_to_open(self):
         """ This opens the xml view specified in xml_id for the current vehicle """
@@ -524,6 +1007,7 @@ class FleetVehicle(models.Model):
 
     def action_open_odometer_report(self):
         self.ensure_one()
+        self.env['fleet.vehicle.odometer.report']._process_refresh_queue(self.ids)
         action = self.env["ir.actions.actions"]._for_xml_id('fleet.fleet_vehicle_odometer_reporting_action')
         action.update({
             'domain': [('vehicle_id', '=', self.id)],
@@ -14,6 +14,9 @@ class FleetVehicleAssignationLog(models.Model):
     date_start = fields.Date(string="Start Date")
     date_end = fields.Date(string="End Date")
 
+    _vehicle_order_idx = models.Index("(vehicle_id, create_date DESC, date_start DESC)")
+    _open_idx = models.Index("(vehicle_id) WHERE date_end IS NULL")
+
     @api.depends('driver_id', 'vehicle_id')
     def _compute_display_name(self):
         for rec in self:
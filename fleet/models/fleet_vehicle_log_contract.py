@@ -4,14 +4,18 @@
 from dateutil.relativedelta import relativedelta
 
 from odoo import api, fields, models
+from odoo.tools import SQL, split_every
 
 
 class FleetVehicleLogContract(models.Model):
     _name = 'fleet.vehicle.log.contract'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'fleet.export.mixin']
     _description = 'Vehicle Contract'
     _order = 'state desc,expiration_date'
 
+    # the open contracts to renew, see _schedule_renewal_activities()
+    _open_expiration_idx = models.Index("(expiration_date) WHERE state = 'open' AND active")
+
     def compute_next_year_date(self, strdate):
         oneyear = relativedelta(years=1)
         start_date = fields.Date.from_string(strdate)
@@ -101,25 +105,224 @@ class FleetVehicleLogContract(models.Model):
                 record.days_left = -1
                 record.expires_today = False
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        contracts = super().create(vals_list)
+        contracts._generate_cost_ledger()
+        contracts._enqueue_cost_report_refresh()
+        return contracts
+
     def write(self, vals):
+        refresh_cost_report = not {
+            'vehicle_id', 'amount', 'date', 'start_date', 'expiration_date', 'cost_frequency', 'cost_generated', 'state',
+        }.isdisjoint(vals)
+        if refresh_cost_report:
+            self._enqueue_cost_report_refresh()
+        reopened = self.filtered(lambda c: c.state == 'closed') if vals.get('state') not in (None, 'closed') else self.browse()
         res = super(FleetVehicleLogContract, self).write(vals)
+        if not {
+            'vehicle_id', 'company_id', 'date', 'start_date', 'expiration_date', 'cost_frequency', 'cost_generated',
+        }.isdisjoint(vals):
+            self._generate_cost_ledger()
+        elif reopened:
+            reopened._generate_cost_ledger()
+        if vals.get('state') == 'closed':
+            self._prune_cost_ledger()
+        if refresh_cost_report:
+            self._enqueue_cost_report_refresh()
         if 'start_date' in vals or 'expiration_date' in vals:
-            date_today = fields.Date.today()
-            future_contracts, running_contracts, expired_contracts = self.env[self._name], self.env[self._name], self.env[self._name]
-            for contract in self.filtered(lambda c: c.start_date and c.state != 'closed'):
-                if date_today < contract.start_date:
-                    future_contracts |= contract
-                elif not contract.expiration_date or contract.start_date <= date_today <= contract.expiration_date:
-                    running_contracts |= contract
-                else:
-                    expired_contracts |= contract
-            future_contracts.action_draft()
-            running_contracts.action_open()
-            expired_contracts.action_expire()
+            self._reconcile_state(reopen=True)
         if vals.get('expiration_date') or vals.get('user_id'):
             self.activity_reschedule(['fleet.mail_act_fleet_contract_to_renew'], date_deadline=vals.get('expiration_date'), new_user_id=vals.get('user_id'))
         return res
 
+    def unlink(self):
+        self._enqueue_cost_report_refresh()
+        return super().unlink()
+
+    @api.model
+    def _get_cost_ledger_horizon(self):
+        """ Return the last day up to which the recurring costs of the
+        contracts are generated: the end of next month. """
+        return fields.Date.end_of(fields.Date.today() + relativedelta(months=1), 'month')
+
+    def _generate_cost_ledger(self, date_from=None):
+        """ (Re)generate the recurring costs of the contracts that are not
+        closed, from ``date_from`` on (from their start if not given), up to
+        their expiration date or the horizon of the ledger. Costs are booked:
+
+        * daily: once a month, for the days of the month the contract covers;
+        * weekly: every week from the start date;
+        * monthly: every month from the month of the start date;
+        * yearly: every year, in the month of the cost date (or start date).
+        """
+        if not self:
+            return
+        self.flush_recordset([
+            'vehicle_id', 'company_id', 'date', 'start_date', 'expiration_date', 'state', 'cost_frequency', 'cost_generated',
+        ])
+        from_condition = SQL("cost.date >= %s", date_from) if date_from else SQL("TRUE")
+        self.env.cr.execute(SQL(
+            """
+            DELETE FROM fleet_vehicle_log_contract_cost cost
+             USING fleet_vehicle_log_contract contract
+             WHERE cost.contract_id = contract.id
+               AND contract.id = ANY(%(ids)s)
+               AND contract.state != 'closed'
+               AND %(from_condition)s
+            """,
+            ids=self.ids,
+            from_condition=from_condition,
+        ))
+        self.env.cr.execute(SQL(
+            """
+            WITH contract AS (
+                SELECT id, vehicle_id, company_id, cost_frequency, cost_generated, start_date,
+                       LEAST(expiration_date, %(horizon)s) AS end_date,
+                       COALESCE(date, start_date) AS anniversary_date
+                  FROM fleet_vehicle_log_contract
+                 WHERE id = ANY(%(ids)s)
+                   AND state != 'closed'
+                   AND start_date IS NOT NULL
+                   AND cost_generated != 0
+                   AND cost_frequency != 'no'
+            ),
+            months AS (
+                SELECT contract.*, CAST(month AS DATE) AS month
+                  FROM contract
+            CROSS JOIN generate_series(date_trunc('month', contract.start_date), contract.end_date, '1 month') month
+                 WHERE contract.cost_frequency IN ('daily', 'monthly', 'yearly')
+            ),
+            cost AS (
+                SELECT id, vehicle_id, company_id, month AS date,
+                       cost_generated * (LEAST(CAST(month + INTERVAL '1 month' AS DATE), end_date + 1) - GREATEST(month, start_date)) AS amount
+                  FROM months
+                 WHERE cost_frequency = 'daily'
+                 UNION ALL
+                SELECT id, vehicle_id, company_id, month AS date, cost_generated AS amount
+                  FROM months
+                 WHERE cost_frequency = 'monthly'
+                 UNION ALL
+                SELECT id, vehicle_id, company_id, month AS date, cost_generated AS amount
+                  FROM months
+                 WHERE cost_frequency = 'yearly'
+                   AND EXTRACT(MONTH FROM month) = EXTRACT(MONTH FROM anniversary_date)
+                 UNION ALL
+                SELECT contract.id, contract.vehicle_id, contract.company_id, CAST(week AS DATE) AS date, contract.cost_generated AS amount
+                  FROM contract
+            CROSS JOIN generate_series(CAST(contract.start_date AS TIMESTAMP), contract.end_date, '1 week') week
+                 WHERE contract.cost_frequency = 'weekly'
+            )
+            INSERT INTO fleet_vehicle_log_contract_cost (contract_id, vehicle_id, company_id, date, amount)
+                 SELECT id, vehicle_id, company_id, date, amount
+                   FROM cost
+                  WHERE amount != 0 AND %(from_condition)s
+            """,
+            ids=self.ids,
+            horizon=self._get_cost_ledger_horizon(),
+            from_condition=from_condition,
+        ))
+        self.env['fleet.vehicle.log.contract.cost'].invalidate_model()
+
+    def _prune_cost_ledger(self):
+        """ Remove the recurring costs of the contracts after today. """
+        self.env['fleet.vehicle.log.contract.cost'].flush_model()
+        self.env.cr.execute(SQL(
+            "DELETE FROM fleet_vehicle_log_contract_cost WHERE contract_id = ANY(%s) AND date > %s",
+            self.ids, fields.Date.today(),
+        ))
+        self.env['fleet.vehicle.log.contract.cost'].invalidate_model()
+
+    @api.model
+    def _extend_cost_ledger(self, batch_size=1000):
+        """ Extend the recurring costs of the running contracts up to the
+        horizon of the ledger, regenerating them from the current month. """
+        date_from = fields.Date.start_of(fields.Date.today(), 'month')
+        contracts = self.with_context(active_test=False).search([
+            ('state', '!=', 'closed'),
+            ('cost_frequency', '!=', 'no'),
+            ('start_date', '!=', False),
+            '|', ('expiration_date', '=', False), ('expiration_date', '>=', date_from),
+        ], order='id')
+        horizon = self._get_cost_ledger_horizon()
+        for contract_ids in split_every(batch_size, contracts.ids):
+            batch = self.browse(contract_ids)
+            batch._generate_cost_ledger(date_from)
+            self.env['fleet.vehicle.cost.report']._enqueue_refresh([
+                (vehicle_id, date_from, horizon) for vehicle_id in set(batch.vehicle_id.ids)
+            ])
+            if not self.env['ir.cron']._commit_progress(len(contract_ids)):
+                return
+
+    def _enqueue_cost_report_refresh(self):
+        # open-ended contracts book costs up to the horizon of the ledger
+        horizon = self._get_cost_ledger_horizon()
+        cells = []
+        for contract in self:
+            dates = [date for date in (contract.date, contract.start_date, contract.expiration_date) if date]
+            if dates:
+                date_to = max(dates) if contract.expiration_date else max(*dates, horizon)
+                cells.append((contract.vehicle_id.id, min(dates), date_to))
+        self.env['fleet.vehicle.cost.report']._enqueue_refresh(cells)
+
+    @api.model
+    def _get_target_state_sql(self, alias, reopen=False):
+        """ Return the SQL expression of the state a contract of the table
+        ``alias`` should have given its dates: 'futur' before its start date,
+        'expired' after its expiration date, 'open' in between for a future
+        contract, or any contract with ``reopen``. Other contracts keep their
+        state. With ``reopen``, used when the dates of the contracts are
+        written, only the contracts having a start date change state. """
+        return SQL(
+            """
+            CASE
+                WHEN %(start_date)s > %(today)s THEN 'futur'
+                WHEN %(expiration_date)s < %(today)s AND (%(start_date)s IS NOT NULL OR NOT %(reopen)s) THEN 'expired'
+                WHEN %(start_date)s <= %(today)s AND (%(state)s = 'futur' OR %(reopen)s) THEN 'open'
+                ELSE %(state)s
+            END
+            """,
+            start_date=SQL.identifier(alias, 'start_date'),
+            expiration_date=SQL.identifier(alias, 'expiration_date'),
+            state=SQL.identifier(alias, 'state'),
+            today=fields.Date.today(),
+            reopen=reopen,
+        )
+
+    def _reconcile_state(self, reopen=False):
+        """ Set the state of the contracts that are not closed according to
+        their dates (see ``_get_target_state_sql``). The target states are
+        computed in SQL, and only the contracts whose state changes are
+        written, with one write per target state, so that the change is
+        tracked along with the other changes of the transaction.
+
+        :return: the contracts whose state changed
+        """
+        if not self:
+            return self
+        self.flush_recordset(['state', 'start_date', 'expiration_date'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT target, ARRAY_AGG(id ORDER BY id)
+              FROM (
+                    SELECT contract.id, contract.state, %(target)s AS target
+                      FROM fleet_vehicle_log_contract contract
+                     WHERE contract.id = ANY(%(ids)s)
+                       AND contract.state != 'closed'
+              ) contract
+             WHERE target != state
+          GROUP BY target
+            """,
+            target=self._get_target_state_sql('contract', reopen),
+            ids=self.ids,
+        ))
+        changed = self.browse()
+        for state, contract_ids in self.env.cr.fetchall():
+            contracts = self.browse(contract_ids)
+            contracts.write({'state': state})
+            changed |= contracts
+        return changed
+
     def action_close(self):
         self.write({'state': 'closed'})
 
@@ -133,36 +336,118 @@ class FleetVehicleLogContract(models.Model):
         self.write({'state': 'expired'})
 
     @api.model
-    def scheduler_manage_contract_expiration(self):
+    def scheduler_manage_contract_expiration(self, shard_index=0, shard_count=1, company_ids=None):
         # This method is called by a cron task
         # It manages the state of a contract, possibly by posting a message on the vehicle concerned and updating its status
+        # The work is done in chunks of `fleet.contract_expiration_batch_size` contracts, committed one by one
+        # when running as a cron, and a killed run resumes after the last contract it processed.
+        # It can be split between several crons, each one processing a shard of the vehicles or some companies
+        # (e.g. `model.scheduler_manage_contract_expiration(shard_index=1, shard_count=4)`): the contracts are
+        # claimed with FOR UPDATE SKIP LOCKED, so that concurrent crons never process the same contract.
+        # Returns whether every contract has been processed.
         params = self.env['ir.config_parameter'].sudo()
-        delay_alert_contract = int(params.get_param('hr_fleet.delay_alert_contract', default=30))
-        date_today = fields.Date.from_string(fields.Date.today())
-        outdated_days = fields.Date.to_string(date_today + relativedelta(days=+delay_alert_contract))
-        reminder_activity_type = self.env.ref('fleet.mail_act_fleet_contract_to_renew')
-        nearly_expired_contracts = self.search([
-            ('state', '=', 'open'),
-            ('expiration_date', '<', outdated_days),
-            ('user_id', '!=', False)
-        ]
-        ).filtered(
-            lambda nec: reminder_activity_type not in nec.activity_ids.activity_type_id
+        batch_size = int(params.get_param('fleet.contract_expiration_batch_size', default=1000))
+        shard = self._get_contract_shard_condition(shard_index, shard_count, company_ids)
+        if not self._schedule_renewal_activities(batch_size, shard):
+            return False
+        condition = SQL(
+            "contract.state != 'closed' AND %s != contract.state AND %s",
+            self._get_target_state_sql('contract'), shard,
         )
+        while contracts := self._claim_contracts(condition, batch_size):
+            contracts._reconcile_state()
+            if not self.env['ir.cron']._commit_progress(len(contracts)):
+                return False
+        return True
 
-        for contract in nearly_expired_contracts:
-            contract.activity_schedule(
-                'fleet.mail_act_fleet_contract_to_renew', contract.expiration_date,
-                user_id=contract.user_id.id)
+    @api.model
+    def _get_contract_shard_condition(self, shard_index=0, shard_count=1, company_ids=None):
+        """ Return the SQL condition restricting the contracts of the table
+        aliased ``contract`` to a shard: the vehicles whose id modulo
+        ``shard_count`` is ``shard_index``, and the given companies if any.
+        Sharding on vehicles keeps the recomputation of the vehicles of
+        different shards apart. """
+        conditions = [SQL("TRUE")]
+        if shard_count > 1:
+            conditions.append(SQL("mod(contract.vehicle_id, %s) = %s", shard_count, shard_index))
+        if company_ids:
+            conditions.append(SQL("contract.company_id = ANY(%s)", list(company_ids)))
+        return SQL(" AND ").join(conditions)
 
-        expired_contracts = self.search([('state', 'not in', ['expired', 'closed']), ('expiration_date', '<',fields.Date.today() )])
-        expired_contracts.action_expire()
+    @api.model
+    def _claim_contracts(self, condition, limit):
+        """ Lock and return at most ``limit`` active contracts matching the
+        SQL ``condition``, skipping the ones locked by other transactions. """
+        self.flush_model(['state', 'active', 'start_date', 'expiration_date', 'vehicle_id', 'company_id'])
+        self.env.cr.execute(SQL("""
+            SELECT contract.id
+              FROM fleet_vehicle_log_contract contract
+             WHERE contract.active AND %s
+          ORDER BY contract.id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+        """, condition, limit))
+        return self.browse(contract_id for contract_id, in self.env.cr.fetchall())
 
-        futur_contracts = self.search([('state', 'not in', ['futur', 'closed']), ('start_date', '>', fields.Date.today())])
-        futur_contracts.action_draft()
+    @api.model
+    def _schedule_renewal_activities(self, batch_size, shard=None):
+        """ Schedule a renewal activity on the running contracts expiring
+        within the alert delay that do not have one yet, in chunks of
+        ``batch_size`` contracts. Every run starts over from the first
+        contract: the contracts processed by an interrupted run already have
+        their activity, and are skipped.
 
-        now_running_contracts = self.search([('state', '=', 'futur'), ('start_date', '<=', fields.Date.today())])
-        now_running_contracts.action_open()
+        :return: whether every contract has been processed
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        delay_alert_contract = int(params.get_param('hr_fleet.delay_alert_contract', default=30))
+        outdated_days = fields.Date.today() + relativedelta(days=+delay_alert_contract)
+        reminder_activity_type = self.env.ref('fleet.mail_act_fleet_contract_to_renew')
+        res_model_id = self.env['ir.model']._get_id(self._name)
+        last_id = 0
+        self.flush_model(['state', 'active', 'expiration_date', 'user_id', 'vehicle_id', 'company_id'])
+        self.env['mail.activity'].flush_model(['res_model', 'res_id', 'activity_type_id', 'active'])
+        while True:
+            self.env.cr.execute(SQL("""
+                SELECT contract.id, contract.expiration_date, contract.user_id
+                  FROM fleet_vehicle_log_contract contract
+                 WHERE contract.id > %(last_id)s
+                   AND contract.active
+                   AND contract.state = 'open'
+                   AND contract.expiration_date < %(outdated_days)s
+                   AND contract.user_id IS NOT NULL
+                   AND %(shard)s
+                   AND NOT EXISTS (
+                        SELECT 1
+                          FROM mail_activity activity
+                         WHERE activity.res_model = %(res_model)s
+                           AND activity.res_id = contract.id
+                           AND activity.activity_type_id = %(activity_type_id)s
+                           AND activity.active
+                   )
+              ORDER BY contract.id
+                 LIMIT %(limit)s
+                   FOR UPDATE OF contract SKIP LOCKED
+            """, last_id=last_id, outdated_days=outdated_days, shard=shard or SQL("TRUE"), res_model=self._name,
+                activity_type_id=reminder_activity_type.id, limit=batch_size))
+            rows = self.env.cr.fetchall()
+            if not rows:
+                return True
+            self.env['mail.activity'].create([{
+                'activity_type_id': reminder_activity_type.id,
+                'summary': reminder_activity_type.summary or '',
+                'note': reminder_activity_type.default_note,
+                'automated': True,
+                'date_deadline': expiration_date,
+                'res_model_id': res_model_id,
+                'res_id': contract_id,
+                'user_id': user_id,
+            } for contract_id, expiration_date, user_id in rows])
+            last_id = rows[-1][0]
+            if not self.env['ir.cron']._commit_progress(len(rows)):
+                return False
 
     def run_scheduler(self):
-        self.scheduler_manage_contract_expiration()
+        if not self.scheduler_manage_contract_expiration():
+            return
+        self._extend_cost_ledger()
@@ -0,0 +1,20 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from odoo import fields, models
+
+
+class FleetVehicleLogContractCost(models.Model):
+    _name = 'fleet.vehicle.log.contract.cost'
+    _description = 'Recurring Cost of a Vehicle Contract'
+    _order = 'date desc, id desc'
+    _log_access = False
+
+    contract_id = fields.Many2one('fleet.vehicle.log.contract', 'Contract', required=True, index=True, ondelete='cascade', readonly=True)
+    vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle', required=True, ondelete='cascade', readonly=True)
+    company_id = fields.Many2one('res.company', 'Company', readonly=True)
+    currency_id = fields.Many2one('res.currency', related='company_id.currency_id')
+    date = fields.Date('Period Start', required=True, readonly=True)
+    amount = fields.Monetary('Cost', readonly=True)
+
+    _vehicle_date_idx = models.Index("(vehicle_id, date)")
+    _date_idx = models.Index("(date)")
@@ -7,7 +7,7 @@ from odoo.exceptions import UserError
 
 class FleetVehicleLogServices(models.Model):
     _name = 'fleet.vehicle.log.services'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'fleet.export.mixin']
     _rec_name = 'service_type_id'
     _description = 'Services for vehicles'
 
@@ -66,7 +66,44 @@ class FleetVehicleLogServices(models.Model):
                 # data as it would result to the creation of a
                 # odometer log with 0, which is to be avoided
                 del data['odometer']
-        return super(FleetVehicleLogServices, self).create(vals_list)
+        services = super(FleetVehicleLogServices, self).create(vals_list)
+        services._update_rollup(1)
+        services._enqueue_cost_report_refresh()
+        return services
+
+    def write(self, vals):
+        refresh_cost_report = not {'vehicle_id', 'amount', 'date', 'active', 'state'}.isdisjoint(vals)
+        update_rollup = not {'vehicle_id', 'company_id', 'service_type_id', 'amount', 'date', 'active', 'state'}.isdisjoint(vals)
+        if refresh_cost_report:
+            self._enqueue_cost_report_refresh()
+        if update_rollup:
+            self._update_rollup(-1)
+        res = super().write(vals)
+        if update_rollup:
+            self._update_rollup(1)
+        if refresh_cost_report:
+            self._enqueue_cost_report_refresh()
+        return res
+
+    def unlink(self):
+        self._update_rollup(-1)
+        self._enqueue_cost_report_refresh()
+        return super().unlink()
+
+    def _update_rollup(self, sign):
+        """ Add (``sign`` = 1) or remove (``sign`` = -1) the services from the
+        monthly rollup of the service costs. """
+        self.env['fleet.vehicle.log.services.rollup']._apply_deltas([
+            (service.vehicle_id.id, service.company_id.id, service.date, service.service_type_id.id, sign * service.amount, sign)
+            for service in self
+            if service.active and service.state != 'cancelled' and service.date
+        ])
+
+    def _enqueue_cost_report_refresh(self):
+        self.env['fleet.vehicle.cost.report']._enqueue_refresh([
+            (service.vehicle_id.id, service.date, service.date)
+            for service in self if service.date
+        ])
 
     @api.depends('vehicle_id')
     def _compute_purchaser_id(self):
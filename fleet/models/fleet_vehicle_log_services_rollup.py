@@ -0,0 +1,156 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from collections import defaultdict
+
+from odoo import _, api, fields, models
+from odoo.tools import SQL
+
+
+class FleetVehicleLogServicesRollup(models.Model):
+    """ Monthly totals of the services of each vehicle.
+
+    One row sums the services of a vehicle, a company, a month and a service
+    type that are active and not cancelled. The rows are kept up to date by
+    the services themselves, which apply their contribution as a delta in the
+    same transaction: concurrent updates of a same row are serialized by
+    PostgreSQL instead of overwriting each other.
+    """
+    _name = 'fleet.vehicle.log.services.rollup'
+    _description = 'Monthly Service Costs of a Vehicle'
+    _order = 'date desc, vehicle_id'
+    _log_access = False
+
+    vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle', required=True, ondelete='cascade', readonly=True)
+    company_id = fields.Many2one('res.company', 'Company', readonly=True)
+    currency_id = fields.Many2one('res.currency', related='company_id.currency_id')
+    date = fields.Date('Month', required=True, readonly=True)
+    service_type_id = fields.Many2one('fleet.service.type', 'Service Type', required=True, ondelete='cascade', readonly=True)
+    amount = fields.Monetary('Cost', readonly=True)
+    count = fields.Integer('Services', readonly=True)
+
+    _key_idx = models.UniqueIndex("(vehicle_id, date, service_type_id, COALESCE(company_id, 0))")
+    _date_idx = models.Index("(date)")
+
+    def init(self):
+        # fill the rollup when the model is installed, the services keeping it
+        # up to date afterwards
+        self.env.cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(self._table)))
+        if not self.env.cr.rowcount:
+            self._rebuild_rollup()
+
+    def _get_rollup_query(self):
+        """ Return the SQL recomputing the rollup from the services. """
+        return SQL("""
+            SELECT vehicle_id,
+                   company_id,
+                   date_trunc('month', date)::date AS date,
+                   service_type_id,
+                   COALESCE(SUM(amount), 0) AS amount,
+                   COUNT(*) AS count
+              FROM fleet_vehicle_log_services
+             WHERE active AND state != 'cancelled' AND date IS NOT NULL
+          GROUP BY vehicle_id, company_id, date_trunc('month', date), service_type_id
+        """)
+
+    @api.model
+    def _rebuild_rollup(self):
+        """ Recompute the whole rollup from the services. """
+        self.env['fleet.vehicle.log.services'].flush_model()
+        self.env.cr.execute(SQL("DELETE FROM %s", SQL.identifier(self._table)))
+        self.env.cr.execute(SQL(
+            "INSERT INTO %s (vehicle_id, company_id, date, service_type_id, amount, count) %s",
+            SQL.identifier(self._table), self._get_rollup_query(),
+        ))
+        self.invalidate_model()
+
+    @api.model
+    def _apply_deltas(self, deltas):
+        """ Add the given ``(vehicle_id, company_id, date, service_type_id,
+        amount, count)`` deltas to the rollup, ``date`` being any day of the
+        month. Rows left without any service are removed. """
+        totals = defaultdict(lambda: [0.0, 0])
+        for vehicle_id, company_id, date, service_type_id, amount, count in deltas:
+            total = totals[vehicle_id, company_id or None, fields.Date.start_of(date, 'month'), service_type_id]
+            total[0] += amount or 0.0
+            total[1] += count
+        totals = {key: total for key, total in totals.items() if total[1] or total[0]}
+        if not totals:
+            return
+        vehicle_ids, company_ids, dates, service_type_ids = zip(*totals)
+        amounts, counts = zip(*totals.values())
+        table = SQL.identifier(self._table)
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO %(table)s AS rollup (vehicle_id, company_id, date, service_type_id, amount, count)
+                 SELECT * FROM unnest(%(vehicle_ids)s::int[], %(company_ids)s::int[], %(dates)s::date[],
+                                      %(service_type_ids)s::int[], %(amounts)s::numeric[], %(counts)s::int[])
+            ON CONFLICT (vehicle_id, date, service_type_id, (COALESCE(company_id, 0))) DO UPDATE
+                    SET amount = rollup.amount + EXCLUDED.amount,
+                        count = rollup.count + EXCLUDED.count
+            """,
+            table=table,
+            vehicle_ids=list(vehicle_ids),
+            company_ids=list(company_ids),
+            dates=list(dates),
+            service_type_ids=list(service_type_ids),
+            amounts=list(amounts),
+            counts=list(counts),
+        ))
+        self.env.cr.execute(SQL(
+            "DELETE FROM %s WHERE count <= 0 AND vehicle_id = ANY(%s)", table, list(set(vehicle_ids)),
+        ))
+        self.invalidate_model()
+
+    @api.model
+    def _verify_rollup(self):
+        """ Compare the rollup with a recomputation from the services, and
+        return the differing rows as ``(vehicle_id, company_id, date,
+        service_type_id, expected (amount, count), actual (amount, count))``
+        tuples. """
+        self.env['fleet.vehicle.log.services'].flush_model()
+        self.flush_model()
+        self.env.cr.execute(SQL(
+            """
+            WITH expected AS (%(query)s)
+            SELECT COALESCE(e.vehicle_id, r.vehicle_id),
+                   COALESCE(e.company_id, r.company_id),
+                   COALESCE(e.date, r.date),
+                   COALESCE(e.service_type_id, r.service_type_id),
+                   e.amount, e.count, r.amount, r.count
+              FROM expected e
+         FULL JOIN %(table)s r
+                ON r.vehicle_id = e.vehicle_id
+               AND r.date = e.date
+               AND r.service_type_id = e.service_type_id
+               AND COALESCE(r.company_id, 0) = COALESCE(e.company_id, 0)
+             WHERE e.count IS DISTINCT FROM r.count
+                OR ABS(COALESCE(e.amount, 0) - COALESCE(r.amount, 0)) > 0.005
+          ORDER BY 1, 3, 4
+            """,
+            query=self._get_rollup_query(),
+            table=SQL.identifier(self._table),
+        ))
+        return [
+            (vehicle_id, company_id, date, service_type_id, (expected_amount, expected_count), (amount, count))
+            for vehicle_id, company_id, date, service_type_id, expected_amount, expected_count, amount, count
+            in self.env.cr.fetchall()
+        ]
+
+    @api.model
+    def _action_verify_rollup(self):
+        differences = self._verify_rollup()
+        if not differences:
+            message, notification_type = _("The service costs rollup matches the services."), 'success'
+        else:
+            message, notification_type = _(
+                "The service costs rollup differs from the services on %s rows. Rebuild it to fix them.",
+                len(differences),
+            ), 'warning'
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': message,
+                'type': notification_type,
+                'sticky': bool(differences),
+            },
+        }
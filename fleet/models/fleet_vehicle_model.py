@@ -1,9 +1,11 @@
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
 from datetime import datetime
+from operator import eq, ge, gt, le, lt, ne
 
 from odoo import _, api, fields, models
 from odoo.fields import Domain
+from odoo.tools import SQL
 
 
 FUEL_TYPES = [
@@ -18,6 +20,15 @@ FUEL_TYPES = [
     ('electric', 'Electric'),
 ]
 
+COUNT_OPERATORS = {
+    '=': eq,
+    '!=': ne,
+    '<': lt,
+    '<=': le,
+    '>': gt,
+    '>=': ge,
+}
+
 
 class FleetVehicleModel(models.Model):
     _name = 'fleet.vehicle.model'
@@ -29,7 +40,7 @@ class FleetVehicleModel(models.Model):
         current_year = datetime.now().year
         return [(str(i), i) for i in range(1970, current_year + 1)]
 
-    name = fields.Char('Model name', required=True, tracking=True)
+    name = fields.Char('Model name', required=True, tracking=True, index='trigram')
     brand_id = fields.Many2one('fleet.vehicle.model.brand', 'Manufacturer', required=True, tracking=True, index='btree_not_null')
     category_id = fields.Many2one('fleet.vehicle.model.category', 'Category', tracking=True)
     vendors = fields.Many2many('res.partner', 'fleet_vehicle_model_vendors', 'model_id', 'partner_id', string='Vendors')
@@ -102,9 +113,52 @@ class FleetVehicleModel(models.Model):
 
     @api.model
     def _search_vehicle_count(self, operator, value):
-        fleet_models = self.env['fleet.vehicle.model'].search_fetch([], ['vehicle_count'])
-        fleet_models = fleet_models.filtered_domain([('vehicle_count', operator, value)])
-        return [('id', 'in', fleet_models.ids)]
+        """ Search the models by number of vehicles with a subquery counting
+        the vehicles of each model. When models without vehicles match, the
+        search excludes the models whose count does not match instead. """
+        if operator in ('in', 'not in'):
+            counts = tuple(count or 0 for count in value)
+            condition = SQL("COUNT(*) IN %s", counts) if counts else SQL("FALSE")
+            zero_matches = 0 in counts
+            if operator == 'not in':
+                condition, zero_matches = SQL("NOT (%s)", condition), not zero_matches
+        elif operator in COUNT_OPERATORS:
+            condition = SQL("COUNT(*) %s %s", SQL(operator), value or 0)
+            zero_matches = COUNT_OPERATORS[operator](0, value or 0)
+        else:
+            return NotImplemented
+        if zero_matches:
+            condition = SQL("NOT (%s)", condition)
+
+        vehicle_query = self.env['fleet.vehicle']._search([('model_id', '!=', False)])
+        vehicle_query.groupby = SQL.identifier(vehicle_query.table, 'model_id')
+        vehicle_query.having = condition
+        query = self.with_context(active_test=False)._search([])
+        query.add_where(SQL(
+            "%s %s (%s)",
+            SQL.identifier(query.table, 'id'),
+            SQL("NOT IN") if zero_matches else SQL("IN"),
+            vehicle_query.select(SQL.identifier(vehicle_query.table, 'model_id')),
+        ))
+        return [('id', 'in', query)]
+
+    def write(self, vals):
+        vehicles = self.env['fleet.vehicle']
+        if not {'name', 'brand_id', 'vehicle_type'}.isdisjoint(vals):
+            vehicles = vehicles.with_context(active_test=False).search([('model_id', 'in', self.ids)])
+        if {'name', 'brand_id'}.isdisjoint(vals):
+            res = super().write(vals)
+        else:
+            with vehicles._defer_name_cascade():
+                res = super().write(vals)
+        if 'vehicle_type' in vals:
+            vehicles._enqueue_cost_report_refresh()
+        # recompute the specifications of the vehicles now, with their
+        # tracking coalesced: the flush that would recompute them later may
+        # run in another context
+        Vehicle = self.env['fleet.vehicle'].with_context(fleet_coalesce_tracking=True)
+        Vehicle._recompute_model(list(set().union(*Vehicle._get_tracking_groups().values())))
+        return res
 
     def action_model_vehicle(self):
         self.ensure_one()
@@ -9,11 +9,13 @@ class FleetVehicleModelBrand(models.Model):
     _description = 'Brand of the vehicle'
     _order = 'name asc'
 
-    name = fields.Char('Name', required=True)
+    name = fields.Char('Name', required=True, index='trigram')
     active = fields.Boolean(default=True)
     image_128 = fields.Image("Logo", max_width=128, max_height=128)
     model_count = fields.Integer(compute="_compute_model_count", string="", store=True)
     model_ids = fields.One2many('fleet.vehicle.model', 'brand_id')
+    vehicle_count = fields.Integer(compute="_compute_vehicle_count", string="Vehicles", store=True)
+    vehicle_ids = fields.One2many('fleet.vehicle', 'brand_id')
 
     @api.depends('model_ids.active')
     def _compute_model_count(self):
@@ -25,6 +27,23 @@ class FleetVehicleModelBrand(models.Model):
         for record in self:
             record.model_count = models_brand.get(record.id, 0)
 
+    @api.depends('vehicle_ids.active')
+    def _compute_vehicle_count(self):
+        vehicle_data = self.env['fleet.vehicle'].sudo()._read_group([
+            ('brand_id', 'in', self.ids), ('active', '=', True)
+        ], ['brand_id'], ['__count'])
+        vehicles_brand = {brand.id: count for brand, count in vehicle_data}
+
+        for record in self:
+            record.vehicle_count = vehicles_brand.get(record.id, 0)
+
+    def write(self, vals):
+        if 'name' not in vals:
+            return super().write(vals)
+        vehicles = self.env['fleet.vehicle'].with_context(active_test=False).search([('brand_id', 'in', self.ids)])
+        with vehicles._defer_name_cascade():
+            return super().write(vals)
+
     def action_brand_model(self):
         self.ensure_one()
         view = {
@@ -6,6 +6,7 @@ from odoo import api, fields, models
 
 class FleetVehicleOdometer(models.Model):
     _name = 'fleet.vehicle.odometer'
+    _inherit = ['fleet.export.mixin']
     _description = 'Odometer log for a vehicle'
     _order = 'date desc'
 
@@ -16,6 +17,27 @@ class FleetVehicleOdometer(models.Model):
     unit = fields.Selection(related='vehicle_id.odometer_unit', string="Unit", readonly=True)
     driver_id = fields.Many2one('res.partner', string="Driver", compute='_compute_driver_id', readonly=False, store=True)
 
+    # the highest readings of the vehicles, see fleet.vehicle._read_last_odometer()
+    _vehicle_value_idx = models.Index("(vehicle_id, value DESC NULLS LAST, date DESC NULLS LAST)")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        odometers = super().create(vals_list)
+        odometers.vehicle_id._enqueue_odometer_report_refresh()
+        return odometers
+
+    def write(self, vals):
+        refresh_odometer_report = not {'vehicle_id', 'date', 'value'}.isdisjoint(vals)
+        vehicles = self.vehicle_id
+        res = super().write(vals)
+        if refresh_odometer_report:
+            (vehicles | self.vehicle_id)._enqueue_odometer_report_refresh()
+        return res
+
+    def unlink(self):
+        self.vehicle_id._enqueue_odometer_report_refresh()
+        return super().unlink()
+
     @api.depends('vehicle_id')
     def _compute_driver_id(self):
         for odometer in self:
@@ -0,0 +1,133 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+
+class FleetVehicleSendMailJob(models.Model):
+    """ Mailing of the drivers of vehicles, sent in the background.
+
+    The job has one line per message to post, created up front. The lines
+    are processed by chunks by ``_process_jobs()``, each chunk being rendered
+    and posted at once, then committed with the messages of its lines: as the
+    lines keep the message they posted, a restarted job only posts the
+    messages that were not committed yet.
+    """
+    _name = 'fleet.vehicle.send.mail.job'
+    _inherit = ['mail.composer.mixin']
+    _description = 'Mailing of Drivers'
+    _order = 'id desc'
+
+    author_id = fields.Many2one('res.partner', 'Author', required=True)
+    group_by_driver = fields.Boolean('One Message per Driver')
+    line_ids = fields.One2many('fleet.vehicle.send.mail.job.line', 'job_id', 'Messages')
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Sending'),
+        ('done', 'Sent'),
+    ], default='queued', required=True, readonly=True)
+    message_count = fields.Integer('Messages to Send', readonly=True)
+    sent_count = fields.Integer('Messages Sent', readonly=True)
+    progress = fields.Float(compute='_compute_progress')
+
+    @api.depends('subject')
+    def _compute_render_model(self):
+        self.render_model = 'fleet.vehicle'
+
+    @api.depends('message_count', 'sent_count')
+    def _compute_progress(self):
+        for job in self:
+            job.progress = 100 * job.sent_count / job.message_count if job.message_count else 100
+
+    @api.model
+    def _create_job(self, vehicles, vals):
+        """ Create the job mailing the drivers of ``vehicles``, with the lines
+        of all its messages, and wake the sending cron up. When the job groups
+        the messages by driver, the drivers of several vehicles get a single
+        message, posted on the first of their vehicles. The message of a
+        vehicle without driver is logged on it without recipient. """
+        job = self.create(vals)
+        if job.group_by_driver:
+            driven = vehicles.filtered('driver_id')
+            first_vehicles = self.env['fleet.vehicle'].union(*(
+                driver_vehicles[0] for driver_vehicles in driven.grouped('driver_id').values()
+            ))
+            vehicles = vehicles.filtered(lambda vehicle: not vehicle.driver_id or vehicle in first_vehicles)
+        self.env['fleet.vehicle.send.mail.job.line'].create([
+            {'job_id': job.id, 'vehicle_id': vehicle.id, 'partner_id': vehicle.driver_id.id}
+            for vehicle in vehicles
+        ])
+        job.message_count = len(vehicles)
+        self.env.ref('fleet.ir_cron_fleet_send_mail_job')._trigger()
+        return job
+
+    @api.model
+    def _process_jobs(self, chunk_size=100):
+        """ Send the messages of the pending jobs, by chunks of ``chunk_size``
+        messages, committing after each chunk. """
+        for job in self.search([('state', '!=', 'done')], order='id'):
+            if not job.with_user(job.create_uid)._process_job(chunk_size):
+                return
+
+    def _process_job(self, chunk_size):
+        """ Send the pending messages of the job.
+
+        :return: whether the cron may go on with the next job
+        """
+        self.ensure_one()
+        Line = self.env['fleet.vehicle.send.mail.job.line']
+        while True:
+            Line.flush_model(['job_id', 'message_id'])
+            self.env.cr.execute(SQL(
+                """
+                SELECT id
+                  FROM fleet_vehicle_send_mail_job_line
+                 WHERE job_id = %s
+                   AND message_id IS NULL
+              ORDER BY id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+                """,
+                self.id, chunk_size,
+            ))
+            lines = Line.browse([line_id for line_id, in self.env.cr.fetchall()])
+            if not lines:
+                self.state = 'done'
+                return True
+            self.state = 'running'
+            self._send_lines(lines)
+            self.sent_count += len(lines)
+            if not self.env['ir.cron']._commit_progress(len(lines)):
+                return False
+
+    def _send_lines(self, lines):
+        vehicles = lines.vehicle_id
+        if self.template_id:
+            subjects = self._render_field(field='subject', res_ids=vehicles.ids)
+            bodies = self._render_field(field='body', res_ids=vehicles.ids)
+        else:
+            subjects = dict.fromkeys(vehicles.ids, self.subject)
+            bodies = dict.fromkeys(vehicles.ids, self.body)
+        # the emails are sent by the mail queue, once the chunk is committed
+        for line in lines.with_context(mail_notify_force_send=False):
+            line.message_id = line.vehicle_id.message_post(
+                author_id=self.author_id.id,
+                body=bodies[line.vehicle_id.id],
+                email_layout_xmlid='mail.mail_notification_light',
+                message_type='comment',
+                partner_ids=line.partner_id.ids,
+                subject=subjects[line.vehicle_id.id],
+            )
+
+
+class FleetVehicleSendMailJobLine(models.Model):
+    _name = 'fleet.vehicle.send.mail.job.line'
+    _description = 'Message of a Mailing of Drivers'
+    _log_access = False
+
+    job_id = fields.Many2one('fleet.vehicle.send.mail.job', 'Mailing', required=True, index=True, ondelete='cascade')
+    vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle', required=True, ondelete='cascade')
+    partner_id = fields.Many2one('res.partner', 'Recipient', ondelete='cascade')
+    message_id = fields.Many2one('mail.message', 'Message', ondelete='set null')
+
+    _pending_idx = models.Index("(job_id, id) WHERE message_id IS NULL")
@@ -8,3 +8,11 @@ class ResConfigSettings(models.TransientModel):
     _inherit = 'res.config.settings'
 
     delay_alert_contract = fields.Integer(string='Delay alert contract outdated', default=30, config_parameter='hr_fleet.delay_alert_contract')
+
+    def set_values(self):
+        previous_delay = int(self.env['ir.config_parameter'].sudo().get_param('hr_fleet.delay_alert_contract', default=30))
+        super().set_values()
+        if self.delay_alert_contract != previous_delay:
+            self.env['fleet.vehicle'].with_context(active_test=False).search([
+                ('log_contracts', '!=', False),
+            ])._recompute_contract_reminder()
@@ -1,2 +1,3 @@
+from . import fleet_report_materialized
 from . import fleet_report
 from . import odometer_report
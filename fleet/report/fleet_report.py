@@ -1,18 +1,23 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
-from odoo import fields, models
-from odoo.tools.sql import drop_view_if_exists, SQL
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, models
+from odoo.tools import SQL
 
 
 class FleetVehicleCostReport(models.Model):
     _name = 'fleet.vehicle.cost.report'
+    _inherit = ['fleet.report.materialized.mixin']
     _description = "Fleet Analysis Report"
     _auto = False
     _order = 'date_start desc'
+    _report_key = ('vehicle_id', 'date_start', 'cost_type')
+    _report_cron = 'fleet.ir_cron_fleet_cost_report_refresh'
 
     company_id = fields.Many2one('res.company', 'Company', readonly=True)
-    vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle', readonly=True)
+    vehicle_id = fields.Many2one('fleet.vehicle', 'Vehicle', readonly=True, ondelete='cascade')
     name = fields.Char('Vehicle Name', readonly=True)
     driver_id = fields.Many2one('res.partner', 'Driver', readonly=True)
     fuel_type = fields.Char('Fuel', readonly=True)
@@ -25,8 +30,9 @@ class FleetVehicleCostReport(models.Model):
         ('service', 'Service')
     ], readonly=True)
 
-    def init(self):
-        query = """
+    def _get_report_query(self, vehicle_ids=None, date_from=None, date_to=None):
+        scope = self._get_scope_condition(SQL("ve.id"), SQL("date_trunc('month', d)"), vehicle_ids, date_from, date_to)
+        return SQL("""
 WITH service_costs AS (
     SELECT
         ve.id AS vehicle_id,
@@ -46,11 +52,11 @@ WITH service_costs AS (
     CROSS JOIN generate_series((
             SELECT
                 min(date)
-                FROM fleet_vehicle_log_services), CURRENT_DATE + '1 month'::interval, '1 month') d
-        LEFT JOIN fleet_vehicle_log_services se ON se.vehicle_id = ve.id
-            AND date_trunc('month', se.date) = date_trunc('month', d)
+                FROM fleet_vehicle_log_services_rollup), CURRENT_DATE + '1 month'::interval, '1 month') d
+        JOIN fleet_vehicle_log_services_rollup se ON se.vehicle_id = ve.id
+            AND se.date = date_trunc('month', d)
     WHERE
-        ve.active AND se.active AND se.state != 'cancelled'
+        ve.active AND %(scope)s
     GROUP BY
         ve.id,
         ve.company_id,
@@ -71,7 +77,13 @@ contract_costs AS (
         ve.fuel_type AS fuel_type,
         date(date_trunc('month', d)) AS date_start,
         vem.vehicle_type as vehicle_type,
-        (COALESCE(sum(co.amount), 0) + COALESCE(sum(cod.cost_generated * extract(day FROM least (date_trunc('month', d) + interval '1 month', cod.expiration_date) - greatest (date_trunc('month', d), cod.start_date))), 0) + COALESCE(sum(com.cost_generated), 0) + COALESCE(sum(coy.cost_generated), 0)) AS
+        (COALESCE(sum(co.amount), 0) + COALESCE((
+            SELECT sum(cost.amount)
+              FROM fleet_vehicle_log_contract_cost cost
+             WHERE cost.vehicle_id = ve.id
+               AND cost.date >= date_trunc('month', d)
+               AND cost.date < date_trunc('month', d) + interval '1 month'
+        ), 0)) AS
         COST,
         'contract' AS cost_type
     FROM
@@ -84,20 +96,8 @@ contract_costs AS (
                 FROM fleet_vehicle), CURRENT_DATE + '1 month'::interval, '1 month') d
         LEFT JOIN fleet_vehicle_log_contract co ON co.vehicle_id = ve.id
             AND date_trunc('month', co.date) = date_trunc('month', d)
-        LEFT JOIN fleet_vehicle_log_contract cod ON cod.vehicle_id = ve.id
-            AND date_trunc('month', cod.start_date) <= date_trunc('month', d)
-            AND date_trunc('month', cod.expiration_date) >= date_trunc('month', d)
-            AND cod.cost_frequency = 'daily'
-    LEFT JOIN fleet_vehicle_log_contract com ON com.vehicle_id = ve.id
-        AND date_trunc('month', com.start_date) <= date_trunc('month', d)
-        AND date_trunc('month', com.expiration_date) >= date_trunc('month', d)
-        AND com.cost_frequency = 'monthly'
-    LEFT JOIN fleet_vehicle_log_contract coy ON coy.vehicle_id = ve.id
-        AND d BETWEEN coy.start_date and coy.expiration_date
-        AND date_part('month', coy.date) = date_part('month', d)
-        AND coy.cost_frequency = 'yearly'
     WHERE
-        ve.active
+        ve.active AND %(scope)s
     GROUP BY
         ve.id,
         ve.company_id,
@@ -109,8 +109,7 @@ contract_costs AS (
         ve.id,
         date_start
 )
-SELECT row_number() OVER (ORDER BY vehicle_id ASC) as id,
-    company_id,
+SELECT company_id,
     vehicle_id,
     name,
     driver_id,
@@ -146,6 +145,27 @@ FROM (
         FROM
             contract_costs cc)
 ) c
-"""
-        drop_view_if_exists(self.env.cr, self._table)
-        self.env.cr.execute(SQL("""CREATE or REPLACE VIEW %s as (%s)""", SQL.identifier(self._table), SQL(query)))
+""", scope=scope)
+
+    @api.model
+    def _process_refresh_queue(self, vehicle_ids=None):
+        """ Also extend the report to the months entering its period: the
+        current month once a month has passed, and the months preceding the
+        oldest acquisition date when it moves back. """
+        if vehicle_ids is not None:
+            return super()._process_refresh_queue(vehicle_ids)
+        self.env.cr.execute(SQL(
+            """
+            SELECT (SELECT MIN(date_start) FROM %(table)s WHERE cost_type = 'contract'),
+                   (SELECT MAX(date_start) FROM %(table)s WHERE cost_type = 'contract'),
+                   (SELECT date(date_trunc('month', MIN(acquisition_date))) FROM fleet_vehicle)
+            """, table=SQL.identifier(self._table),
+        ))
+        first_month, last_month, first_acquisition_month = self.env.cr.fetchone()
+        if last_month:
+            next_month = fields.Date.start_of(fields.Date.today() + relativedelta(months=1), 'month')
+            if last_month < next_month:
+                self._refresh_report(date_from=last_month + relativedelta(months=1), date_to=next_month)
+        if first_month and first_acquisition_month and first_acquisition_month < first_month:
+            self._refresh_report(date_from=first_acquisition_month, date_to=first_month - relativedelta(months=1))
+        return super()._process_refresh_queue()
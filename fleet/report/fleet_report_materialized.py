@@ -0,0 +1,251 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import hashlib
+from collections import defaultdict
+
+from odoo import api, fields, models
+from odoo.tools import SQL, split_every
+from odoo.tools.sql import drop_view_if_exists, table_kind, TableKind
+
+
+class FleetReportMaterializedMixin(models.AbstractModel):
+    """ Persist a fleet report in a real table instead of a view.
+
+    The report rows are computed by ``_get_report_query()`` and stored per
+    vehicle and per month. Changes to the underlying records are queued as
+    (vehicle, period) cells in ``<table>_queue`` by ``_enqueue_refresh()``,
+    and only those cells are recomputed by ``_process_refresh_queue()``.
+    ``_rebuild_report()`` recomputes the whole table. Rows are upserted on
+    ``_report_key``, so that their ids remain stable across refreshes.
+
+    The table is tagged with a digest of its definition: installing or
+    upgrading the module only recreates it when the definition changed, and
+    never runs the report query, the table being filled by the refresh cron
+    ``_report_cron``.
+    """
+    _name = 'fleet.report.materialized.mixin'
+    _description = "Materialized Fleet Report"
+    _auto = False
+    _report_date_field = 'date_start'
+    _report_key = ('vehicle_id', 'date_start')
+    _report_cron = None
+
+    refresh_date = fields.Datetime('Last Refresh', readonly=True)
+
+    @property
+    def _queue_table(self):
+        return f'{self._table}_queue'
+
+    def init(self):
+        if self._abstract:
+            return
+        cr = self.env.cr
+        kind = table_kind(cr, self._table)
+        if kind == TableKind.View:
+            drop_view_if_exists(cr, self._table)
+            kind = None
+        cr.execute(SQL("""
+            CREATE TABLE IF NOT EXISTS %(queue)s (
+                id SERIAL PRIMARY KEY,
+                vehicle_id INTEGER REFERENCES fleet_vehicle ON DELETE CASCADE,
+                date_from DATE,
+                date_to DATE
+            )
+        """, queue=SQL.identifier(self._queue_table)))
+        digest = self._get_report_digest()
+        if kind:
+            cr.execute(SQL("SELECT obj_description(%s::regclass, 'pg_class')", self._table))
+            if cr.fetchone()[0] == digest:
+                return
+        cr.execute(SQL("DROP TABLE IF EXISTS %s CASCADE", SQL.identifier(self._table)))
+        self._create_report_table()
+        self._create_report_indexes()
+        cr.execute(SQL("COMMENT ON TABLE %s IS %s", SQL.identifier(self._table), digest))
+        self._enqueue_rebuild()
+
+    def _get_report_digest(self):
+        """ Return a digest of the definition of the report table: its
+        columns, its key and the query computing its rows. """
+        query = self._get_report_query()
+        definition = repr((
+            [(field.name, field.column_type[1], field.comodel_name) for field in self._get_report_fields()],
+            self._report_key,
+            query.code,
+            query.params,
+        ))
+        return hashlib.sha256(definition.encode()).hexdigest()
+
+    def _get_report_fields(self):
+        return [
+            field for field in self._fields.values()
+            if field.store and field.column_type and field.name not in ('id', 'refresh_date')
+        ]
+
+    def _create_report_table(self):
+        columns = [SQL("id SERIAL PRIMARY KEY"), SQL("refresh_date TIMESTAMP")]
+        for field in self._get_report_fields():
+            column = SQL("%s %s", SQL.identifier(field.name), SQL(field.column_type[1]))
+            if field.type == 'many2one':
+                column = SQL(
+                    "%s REFERENCES %s ON DELETE %s", column,
+                    SQL.identifier(self.env[field.comodel_name]._table), SQL(field.ondelete.upper()),
+                )
+            columns.append(column)
+        self.env.cr.execute(SQL(
+            "CREATE TABLE %s (%s)", SQL.identifier(self._table), SQL(", ").join(columns),
+        ))
+
+    def _create_report_indexes(self):
+        self.env.cr.execute(SQL(
+            "CREATE UNIQUE INDEX IF NOT EXISTS %s ON %s (%s)",
+            SQL.identifier(f'{self._table}_key_index'),
+            SQL.identifier(self._table),
+            SQL(", ").join(SQL.identifier(column) for column in self._report_key),
+        ))
+        self.env.cr.execute(SQL(
+            "CREATE INDEX IF NOT EXISTS %s ON %s (%s)",
+            SQL.identifier(f'{self._table}_date_index'),
+            SQL.identifier(self._table),
+            SQL.identifier(self._report_date_field),
+        ))
+
+    def _get_report_query(self, vehicle_ids=None, date_from=None, date_to=None):
+        """ Return the SQL computing the rows of the report, restricted to the
+        given vehicles and to the months between ``date_from`` and ``date_to``
+        (both first days of months, ``None`` meaning unbounded). The query
+        must select every column of ``_get_report_fields()``. """
+        raise NotImplementedError()
+
+    def _get_scope_condition(self, vehicle_column, month_column, vehicle_ids=None, date_from=None, date_to=None):
+        conditions = [SQL("TRUE")]
+        if vehicle_ids is not None:
+            conditions.append(SQL("%s = ANY(%s)", vehicle_column, list(vehicle_ids)))
+        if date_from:
+            conditions.append(SQL("%s >= %s", month_column, date_from))
+        if date_to:
+            conditions.append(SQL("%s <= %s", month_column, date_to))
+        return SQL(" AND ").join(conditions)
+
+    def _refresh_report(self, vehicle_ids=None, date_from=None, date_to=None):
+        """ Recompute the rows of the given vehicles (all of them when
+        ``vehicle_ids`` is ``None``) for the months between ``date_from`` and
+        ``date_to``. """
+        if date_from:
+            date_from = fields.Date.start_of(date_from, 'month')
+        if date_to:
+            date_to = fields.Date.start_of(date_to, 'month')
+        self.env.flush_all()
+        report_fields = self._get_report_fields()
+        columns = SQL(", ").join(SQL.identifier(field.name) for field in report_fields)
+        self.env.cr.execute(SQL(
+            """
+            WITH report AS (
+                %(query)s
+            ),
+            upserted AS (
+                INSERT INTO %(table)s (%(columns)s, refresh_date)
+                     SELECT %(columns)s, NOW() AT TIME ZONE 'UTC'
+                       FROM report
+                ON CONFLICT (%(key)s) DO UPDATE
+                        SET %(updates)s, refresh_date = EXCLUDED.refresh_date
+                  RETURNING id
+            )
+            DELETE FROM %(table)s
+                  WHERE %(scope)s
+                    AND %(table)s.id NOT IN (SELECT id FROM upserted)
+            """,
+            query=self._get_report_query(vehicle_ids, date_from, date_to),
+            table=SQL.identifier(self._table),
+            columns=columns,
+            key=SQL(", ").join(SQL.identifier(column) for column in self._report_key),
+            updates=SQL(", ").join(
+                SQL("%s = EXCLUDED.%s", SQL.identifier(field.name), SQL.identifier(field.name))
+                for field in report_fields
+                if field.name not in self._report_key
+            ),
+            scope=self._get_scope_condition(
+                SQL.identifier(self._table, 'vehicle_id'),
+                SQL.identifier(self._table, self._report_date_field),
+                vehicle_ids, date_from, date_to,
+            ),
+        ))
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild_report(self):
+        """ Recompute the whole report and empty its refresh queue. """
+        self.env.cr.execute(SQL("DELETE FROM %s", SQL.identifier(self._queue_table)))
+        self._refresh_report()
+
+    @api.model
+    def _enqueue_rebuild(self):
+        """ Queue the recomputation of the whole report, and wake its refresh
+        cron up if it is already installed. """
+        queue = SQL.identifier(self._queue_table)
+        self.env.cr.execute(SQL("DELETE FROM %s", queue))
+        self.env.cr.execute(SQL("INSERT INTO %s (vehicle_id) VALUES (NULL)", queue))
+        self._trigger_report_cron()
+
+    @api.model
+    def _trigger_report_cron(self):
+        """ Wake the refresh cron up when the refresh queue is not empty. On
+        install, the cron is created after ``init()`` queued the rebuild of
+        the report: the post-init hook of the module calls this method again
+        once it exists. """
+        cron = self._report_cron and self.env.ref(self._report_cron, raise_if_not_found=False)
+        if not cron:
+            return
+        self.env.cr.execute(SQL("SELECT 1 FROM %s LIMIT 1", SQL.identifier(self._queue_table)))
+        if self.env.cr.rowcount:
+            cron._trigger()
+
+    @api.model
+    def _enqueue_refresh(self, cells):
+        """ Queue the refresh of the given ``(vehicle_id, date_from, date_to)``
+        cells, a ``None`` date meaning that the period is unbounded. """
+        cells = [(vehicle_id, date_from, date_to) for vehicle_id, date_from, date_to in cells if vehicle_id]
+        if not cells:
+            return
+        vehicle_ids, dates_from, dates_to = zip(*cells)
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO %s (vehicle_id, date_from, date_to)
+                 SELECT * FROM unnest(%s::int[], %s::date[], %s::date[])
+            """,
+            SQL.identifier(self._queue_table), list(vehicle_ids), list(dates_from), list(dates_to),
+        ))
+
+    @api.model
+    def _process_refresh_queue(self, vehicle_ids=None):
+        """ Recompute the cells queued since the last refresh, only for the
+        given vehicles if any. A queued rebuild is only processed when no
+        vehicle is given; the given vehicles are then refreshed entirely. """
+        if vehicle_ids is not None:
+            self.env.cr.execute(SQL(
+                "SELECT 1 FROM %s WHERE vehicle_id IS NULL LIMIT 1", SQL.identifier(self._queue_table),
+            ))
+            if self.env.cr.rowcount:
+                self._refresh_report(vehicle_ids)
+                return
+        self.env.cr.execute(SQL(
+            """
+            WITH processed AS (
+                DELETE FROM %s WHERE %s RETURNING vehicle_id, date_from, date_to
+            )
+            SELECT vehicle_id,
+                   CASE WHEN BOOL_OR(date_from IS NULL) THEN NULL ELSE MIN(date_from) END,
+                   CASE WHEN BOOL_OR(date_to IS NULL) THEN NULL ELSE MAX(date_to) END
+              FROM processed
+          GROUP BY vehicle_id
+            """,
+            SQL.identifier(self._queue_table),
+            self._get_scope_condition(SQL("vehicle_id"), None, vehicle_ids),
+        ))
+        vehicle_ids_per_period = defaultdict(list)
+        for vehicle_id, date_from, date_to in self.env.cr.fetchall():
+            if vehicle_id is None:
+                self._refresh_report()
+                return
+            vehicle_ids_per_period[date_from, date_to].append(vehicle_id)
+        for (date_from, date_to), vehicle_ids in vehicle_ids_per_period.items():
+            for vehicle_ids_chunk in split_every(1000, vehicle_ids):
+                self._refresh_report(vehicle_ids_chunk, date_from, date_to)
@@ -1,17 +1,19 @@
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
-from psycopg2 import sql
-
-from odoo import tools
 from odoo import fields, models
+from odoo.tools import SQL
 
 
 class OdometerReport(models.Model):
     _name = 'fleet.vehicle.odometer.report'
+    _inherit = ['fleet.report.materialized.mixin']
     _description = "Fleet Odometer Analysis Report"
     _auto = False
     _order = 'recorded_date desc'
+    _report_date_field = 'recorded_date'
+    _report_key = ('vehicle_id', 'recorded_date')
+    _report_cron = 'fleet.ir_cron_fleet_odometer_report_refresh'
 
-    vehicle_id = fields.Many2one('fleet.vehicle', "Vehicle", readonly=True)
+    vehicle_id = fields.Many2one('fleet.vehicle', "Vehicle", readonly=True, ondelete='cascade')
     category_id = fields.Many2one(related='vehicle_id.category_id')
     model_id = fields.Many2one(related='vehicle_id.model_id')
     fuel_type = fields.Selection(related='vehicle_id.fuel_type')
@@ -19,13 +21,17 @@ class OdometerReport(models.Model):
     odometer_value = fields.Float("Odometer Value", readonly=True)
     recorded_date = fields.Date('Date', readonly=True)
 
-    def init(self):
-        query = """
+    def _get_report_query(self, vehicle_ids=None, date_from=None, date_to=None):
+        """ The whole reading history of a vehicle is needed to interpolate
+        its odometer, so the vehicles are filtered on the readings while the
+        months are only filtered on the result. """
+        return SQL("""
             -- Step 1: Get the acquisition date for each vehicle
             WITH vehicle_odometer AS (
                 SELECT vehicle.id AS vehicle_id, odometer.value, CAST(odometer.date AS TIMESTAMP), CAST(vehicle.acquisition_date AS TIMESTAMP)
                 FROM fleet_vehicle_odometer odometer
                 LEFT JOIN fleet_vehicle vehicle ON vehicle.id=odometer.vehicle_id
+                WHERE %(vehicle_scope)s
             ),
             -- Step 2: Select only one odometer record (with max value) per date per vehicle
             vehicle_odometer_single_date AS (
@@ -216,18 +222,14 @@ class OdometerReport(models.Model):
             min_month AS (
                 SELECT vehicle_id, MIN(recorded_date) AS min_month_minus_one FROM final_results GROUP BY vehicle_id
             )
-            -- Step 15: Generate final result set with a row number
-            SELECT row_number() OVER () AS id, * FROM (
+            -- Step 15: Generate final result set, one row per vehicle and month
+            SELECT vehicle_id, CAST(recorded_date AS DATE) AS recorded_date, odometer_value, mileage_delta FROM (
                 SELECT vehicle_id, min_month_minus_one AS recorded_date, 0 AS odometer_value, 0 AS mileage_delta FROM min_month
                 UNION ALL
                 SELECT vehicle_id, recorded_date + INTERVAL '1 month' AS recorded_date, odometer_value, mileage_delta FROM final_results
-                ORDER BY vehicle_id, recorded_date
             ) t
-        """
-
-        self.env.cr.execute(query)
-        tools.drop_view_if_exists(self.env.cr, self._table)
-        self.env.cr.execute(
-            sql.SQL("CREATE or REPLACE VIEW {} as ({})").format(
-                sql.Identifier(self._table),
-                sql.SQL(query)))
+            WHERE %(month_scope)s
+        """,
+            vehicle_scope=self._get_scope_condition(SQL("odometer.vehicle_id"), None, vehicle_ids),
+            month_scope=self._get_scope_condition(None, SQL("t.recorded_date"), None, date_from, date_to),
+        )
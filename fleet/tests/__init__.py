@@ -3,3 +3,16 @@
 
 from . import test_access_rights
 from . import test_overdue
+from . import test_odometer
+from . import test_performance
+from . import test_cost_report
+from . import test_contract_shards
+from . import test_vehicle_name
+from . import test_onboarding
+from . import test_driver_rotation
+from . import test_send_mail
+from . import test_query_plans
+from . import test_name_search
+from . import test_vehicle_count
+from . import test_export
+from . import test_service_activity
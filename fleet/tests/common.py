@@ -0,0 +1,131 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import random
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import fields
+
+
+class FleetDataGenerator:
+    """ Seeded generator of large fleets, used by the benchmarks.
+
+    Every method creates its records in one batch and returns them; two
+    generators created with the same seed generate the same data. Vessel
+    models are generated when ``fleet_vessels`` is installed.
+    """
+
+    def __init__(self, env, seed=42):
+        self.env = env(context=dict(env.context, tracking_disable=True, mail_create_nolog=True, mail_notrack=True))
+        self.random = random.Random(seed)
+        self.today = fields.Date.today()
+        self.sequence = 0
+
+    def _next_name(self, prefix):
+        self.sequence += 1
+        return '%s-%06d' % (prefix, self.sequence)
+
+    def brands(self, count):
+        return self.env['fleet.vehicle.model.brand'].create([
+            {'name': self._next_name('Brand')} for _i in range(count)
+        ])
+
+    def models(self, brands, count, vessel_ratio=0.1):
+        Model = self.env['fleet.vehicle.model']
+        vehicle_types = [value for value, _label in Model._fields['vehicle_type'].selection]
+        with_vessels = 'vessel' in vehicle_types
+        vals_list = []
+        for _i in range(count):
+            vals = {
+                'name': self._next_name('Model'),
+                'brand_id': self.random.choice(brands).id,
+                'default_co2': self.random.randint(0, 250),
+                'default_fuel_type': self.random.choice(['diesel', 'gasoline', 'electric', 'full_hybrid']),
+                'seats': self.random.randint(1, 9),
+                'doors': self.random.randint(2, 5),
+                'horsepower': self.random.randint(60, 400),
+            }
+            if with_vessels and self.random.random() < vessel_ratio:
+                vals.update({
+                    'vehicle_type': 'vessel',
+                    'vessel_length': self.random.uniform(5, 300),
+                    'vessel_beam': self.random.uniform(2, 40),
+                    'vessel_tonnage': self.random.uniform(1, 100000),
+                    'passenger_capacity': self.random.randint(0, 500),
+                    'crew_capacity': self.random.randint(1, 50),
+                })
+            else:
+                vals['vehicle_type'] = self.random.choice(['car', 'car', 'car', 'bike'])
+            vals_list.append(vals)
+        return Model.create(vals_list)
+
+    def drivers(self, count):
+        return self.env['res.partner'].create([
+            {'name': self._next_name('Driver')} for _i in range(count)
+        ])
+
+    def vehicles(self, vehicle_models, drivers, count, driver_ratio=0.8):
+        return self.env['fleet.vehicle'].create([{
+            'model_id': self.random.choice(vehicle_models).id,
+            'license_plate': self._next_name('PLATE'),
+            'driver_id': self.random.choice(drivers).id if self.random.random() < driver_ratio else False,
+            'acquisition_date': self.today - relativedelta(days=self.random.randint(0, 8 * 365)),
+        } for _i in range(count)])
+
+    def contracts(self, vehicles, per_vehicle=1):
+        vals_list = []
+        for vehicle in vehicles:
+            for _i in range(per_vehicle):
+                start_date = self.today - relativedelta(days=self.random.randint(-60, 2 * 365))
+                expiration_date = start_date + relativedelta(years=1)
+                if start_date > self.today:
+                    state = 'futur'
+                elif expiration_date < self.today:
+                    state = 'expired'
+                else:
+                    state = 'open'
+                vals_list.append({
+                    'vehicle_id': vehicle.id,
+                    'start_date': start_date,
+                    'expiration_date': expiration_date,
+                    'state': state,
+                    'amount': self.random.randint(100, 5000),
+                    'cost_generated': self.random.randint(10, 500),
+                    'cost_frequency': self.random.choice(['no', 'daily', 'weekly', 'monthly', 'yearly']),
+                    'user_id': self.env.uid,
+                })
+        return self.env['fleet.vehicle.log.contract'].create(vals_list)
+
+    def services(self, vehicles, per_vehicle=2):
+        return self.env['fleet.vehicle.log.services'].create([{
+            'vehicle_id': vehicle.id,
+            'amount': self.random.randint(20, 2000),
+            'date': self.today - relativedelta(days=self.random.randint(0, 3 * 365)),
+            'state': self.random.choice(['new', 'running', 'done', 'cancelled']),
+        } for vehicle in vehicles for _i in range(per_vehicle)])
+
+    def odometers(self, vehicles, years=1):
+        """ One reading per vehicle and per month over the last ``years``. """
+        vals_list = []
+        months = 12 * years
+        for vehicle in vehicles:
+            value = self.random.randint(0, 100000)
+            for month in range(months, 0, -1):
+                value += self.random.randint(0, 3000)
+                vals_list.append({
+                    'vehicle_id': vehicle.id,
+                    'value': value,
+                    'date': self.today - relativedelta(months=month),
+                })
+        return self.env['fleet.vehicle.odometer'].create(vals_list)
+
+    def fleet(self, size, odometer_years=1):
+        """ Generate a complete fleet of ``size`` vehicles, with their models,
+        drivers, contracts, services and odometer readings. """
+        brands = self.brands(max(size // 1000, 5))
+        vehicle_models = self.models(brands, max(size // 100, 10))
+        drivers = self.drivers(max(size // 2, 1))
+        vehicles = self.vehicles(vehicle_models, drivers, size)
+        self.contracts(vehicles)
+        self.services(vehicles)
+        self.odometers(vehicles, years=odometer_years)
+        return vehicles
@@ -0,0 +1,114 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import logging
+import threading
+import time
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, SUPERUSER_ID
+from odoo.tests import common, tagged
+
+from .test_performance import benchmark_sizes
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('post_install', '-at_install', '-standard', 'fleet_stress')
+class TestFleetContractShards(common.TransactionCase):
+    """ Run the contract expiration scheduler in several threads, one shard
+    each, on committed data. The data is created and removed through
+    separate cursors, as the workers cannot see the test transaction. """
+
+    WORKERS = 4
+
+    def _run_in_new_cursor(self, function):
+        with self.registry.cursor() as cr:
+            return function(api.Environment(cr, SUPERUSER_ID, {'tracking_disable': True}))
+
+    def _create_contracts(self, env, size):
+        today = fields.Date.today()
+        brand = env["fleet.vehicle.model.brand"].create({"name": "Shards"})
+        model = env["fleet.vehicle.model"].create({"brand_id": brand.id, "name": "Shards"})
+        vehicles = env["fleet.vehicle"].create([
+            {"model_id": model.id, "license_plate": "SHARD-%s" % i} for i in range(max(size // 10, 1))
+        ])
+        vals_list = []
+        expected_states = []
+        for i in range(size):
+            start_date = today + relativedelta(days=(i % 7 - 3) * 100)
+            expiration_date = start_date + relativedelta(days=(i % 5) * 60 + 10)
+            state = ['open', 'futur', 'expired'][i % 3]
+            if expiration_date < today:
+                expected_states.append('expired')
+            elif start_date > today:
+                expected_states.append('futur')
+            else:
+                expected_states.append('open' if state == 'futur' else state)
+            vals_list.append({
+                'vehicle_id': vehicles[i % len(vehicles)].id,
+                'start_date': start_date,
+                'expiration_date': expiration_date,
+                'state': state,
+                'user_id': env.uid,
+            })
+        contracts = env['fleet.vehicle.log.contract'].create(vals_list)
+        return brand.id, dict(zip(contracts.ids, expected_states))
+
+    def _delete_contracts(self, env, brand_id):
+        brand = env['fleet.vehicle.model.brand'].browse(brand_id)
+        vehicles = env['fleet.vehicle'].with_context(active_test=False).search([('brand_id', '=', brand_id)])
+        contracts = env['fleet.vehicle.log.contract'].with_context(active_test=False).search([('vehicle_id', 'in', vehicles.ids)])
+        env['mail.activity'].search([('res_model', '=', contracts._name), ('res_id', 'in', contracts.ids)]).unlink()
+        contracts.unlink()
+        vehicles.unlink()
+        brand.model_ids.unlink()
+        brand.unlink()
+
+    def _run_workers(self, workers):
+        errors = []
+
+        def work(shard_index):
+            try:
+                self._run_in_new_cursor(lambda env: env['fleet.vehicle.log.contract'].scheduler_manage_contract_expiration(
+                    shard_index=shard_index, shard_count=workers,
+                ))
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(shard_index,)) for shard_index in range(workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(errors)
+        return time.perf_counter() - start
+
+    def _check_contracts(self, env, expected_states):
+        Contract = env['fleet.vehicle.log.contract']
+        contracts = Contract.browse(list(expected_states))
+        for contract in contracts:
+            self.assertEqual(contract.state, expected_states[contract.id])
+        renew_type = env.ref('fleet.mail_act_fleet_contract_to_renew')
+        activities = env['mail.activity'].search([
+            ('res_model', '=', Contract._name),
+            ('res_id', 'in', contracts.ids),
+            ('activity_type_id', '=', renew_type.id),
+        ])
+        self.assertEqual(len(activities), len(set(activities.mapped('res_id'))), "A contract got several renewal activities")
+
+    def test_sharded_contract_expiration(self):
+        for size in benchmark_sizes('1000,10000'):
+            durations = {}
+            for workers in (1, self.WORKERS):
+                brand_id, expected_states = self._run_in_new_cursor(lambda env: self._create_contracts(env, size))
+                try:
+                    durations[workers] = self._run_workers(workers)
+                    self._run_in_new_cursor(lambda env: self._check_contracts(env, expected_states))
+                finally:
+                    self._run_in_new_cursor(lambda env: self._delete_contracts(env, brand_id))
+            _logger.info(
+                "contract expiration of %s contracts: %.3fs with 1 worker, %.3fs with %s workers (x%.1f)",
+                size, durations[1], durations[self.WORKERS], self.WORKERS,
+                durations[1] / (durations[self.WORKERS] or 1e-9),
+            )
@@ -0,0 +1,190 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo.tests import common
+from odoo import fields
+from odoo.addons.fleet import _fleet_post_init
+
+
+class TestFleetCostReport(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        brand = cls.env["fleet.vehicle.model.brand"].create({
+            "name": "Audi",
+        })
+        model = cls.env["fleet.vehicle.model"].create({
+            "brand_id": brand.id,
+            "name": "A3",
+        })
+        cls.car, cls.other_car = cls.env["fleet.vehicle"].create([
+            {"model_id": model.id, "license_plate": "1-ACK-205", "acquisition_date": "2024-01-15"},
+            {"model_id": model.id, "license_plate": "1-ACK-206", "acquisition_date": "2024-01-15"},
+        ])
+        cls.Report = cls.env['fleet.vehicle.cost.report']
+        cls.Report._rebuild_report()
+
+    def _service_costs(self, vehicle):
+        return {
+            report.date_start: report.cost
+            for report in self.Report.search([('vehicle_id', '=', vehicle.id), ('cost_type', '=', 'service')])
+        }
+
+    def test_incremental_refresh(self):
+        service = self.env['fleet.vehicle.log.services'].create({
+            'vehicle_id': self.car.id,
+            'amount': 100,
+            'date': '2024-03-10',
+        })
+        self.assertFalse(self._service_costs(self.car), "The report is only refreshed by the queue")
+
+        other_rows = self.Report.search([('vehicle_id', '=', self.other_car.id)])
+        self.Report._process_refresh_queue()
+        self.assertEqual(self._service_costs(self.car), {fields.Date.to_date('2024-03-01'): 100})
+        self.assertTrue(other_rows.exists(), "Rows of untouched vehicles are kept")
+
+        service.date = '2024-04-02'
+        self.Report._process_refresh_queue()
+        self.assertEqual(self._service_costs(self.car), {fields.Date.to_date('2024-04-01'): 100})
+
+        service.unlink()
+        self.Report._process_refresh_queue()
+        self.assertFalse(self._service_costs(self.car))
+
+    def test_archived_vehicle(self):
+        self.assertTrue(self.Report.search_count([('vehicle_id', '=', self.car.id)]))
+        self.car.active = False
+        self.Report._process_refresh_queue()
+        self.assertFalse(self.Report.search_count([('vehicle_id', '=', self.car.id)]))
+        self.assertTrue(self.Report.search_count([('vehicle_id', '=', self.other_car.id)]))
+
+    def test_definition_change(self):
+        """ The table is only recreated when its definition changes, and is
+        then filled by the refresh cron instead of the upgrade. """
+        rows = self.Report.search([])
+        self.Report.init()
+        self.assertEqual(self.Report.search([]), rows)
+
+        cron = self.env.ref('fleet.ir_cron_fleet_cost_report_refresh')
+        Trigger = self.env['ir.cron.trigger']
+        triggers = Trigger.search([('cron_id', '=', cron.id)])
+        self.env.cr.execute("COMMENT ON TABLE fleet_vehicle_cost_report IS 'outdated'")
+        self.Report.init()
+        self.Report.invalidate_model()
+        self.assertFalse(self.Report.search([]))
+        self.assertTrue(Trigger.search([('cron_id', '=', cron.id)]) - triggers, "The refresh cron is woken up")
+
+        # on install, the post-init hook wakes the cron up once it exists
+        triggers = Trigger.search([('cron_id', '=', cron.id)])
+        _fleet_post_init(self.env)
+        self.assertTrue(Trigger.search([('cron_id', '=', cron.id)]) - triggers)
+        self.Report._process_refresh_queue()
+        self.assertEqual(self.Report.search_count([]), len(rows))
+
+    def test_contract_cost_ledger(self):
+        Contract = self.env['fleet.vehicle.log.contract']
+        Cost = self.env['fleet.vehicle.log.contract.cost']
+        monthly, weekly, daily = Contract.create([{
+            'vehicle_id': self.car.id,
+            'start_date': '2024-01-15',
+            'expiration_date': '2024-03-31',
+            'cost_generated': cost_generated,
+            'cost_frequency': frequency,
+        } for frequency, cost_generated in (('monthly', 100), ('weekly', 10), ('daily', 1))])
+
+        def costs(contract):
+            return {cost.date.isoformat(): cost.amount for cost in Cost.search([('contract_id', '=', contract.id)])}
+
+        self.assertEqual(costs(monthly), {'2024-01-01': 100, '2024-02-01': 100, '2024-03-01': 100})
+        self.assertEqual(len(costs(weekly)), 11)
+        self.assertEqual(costs(daily), {'2024-01-01': 17, '2024-02-01': 29, '2024-03-01': 31})
+
+        monthly.expiration_date = '2024-02-10'
+        self.assertEqual(costs(monthly), {'2024-01-01': 100, '2024-02-01': 100})
+
+        self.Report._process_refresh_queue()
+        contract_costs = {
+            report.date_start.isoformat(): report.cost
+            for report in self.Report.search([('vehicle_id', '=', self.car.id), ('cost_type', '=', 'contract')])
+        }
+        self.assertEqual(contract_costs['2024-02-01'], 100 + 10 * 4 + 29)
+
+        open_ended = Contract.create({
+            'vehicle_id': self.car.id,
+            'start_date': fields.Date.today(),
+            'expiration_date': False,
+            'cost_generated': 50,
+            'cost_frequency': 'monthly',
+        })
+        self.assertEqual(len(costs(open_ended)), 2, "Open-ended contracts are generated up to next month")
+        open_ended.action_close()
+        self.assertEqual(len(costs(open_ended)), 1, "Closing a contract prunes its future costs")
+
+    def test_open_ended_contract_refresh(self):
+        """ The costs of an open-ended contract are refreshed up to the
+        horizon of the ledger, past its start date. """
+        Contract = self.env['fleet.vehicle.log.contract']
+        today = fields.Date.today()
+        Contract.create({
+            'vehicle_id': self.car.id,
+            'start_date': fields.Date.start_of(today, 'month'),
+            'expiration_date': False,
+            'cost_generated': 50,
+            'cost_frequency': 'monthly',
+        })
+        self.Report._process_refresh_queue()
+        next_month = fields.Date.start_of(fields.Date.add(today, months=1), 'month')
+        contract_costs = {
+            report.date_start: report.cost
+            for report in self.Report.search([('vehicle_id', '=', self.car.id), ('cost_type', '=', 'contract')])
+        }
+        self.assertEqual(contract_costs.get(next_month), 50)
+
+    def test_service_rollup(self):
+        Rollup = self.env['fleet.vehicle.log.services.rollup']
+        service_type = self.env['fleet.service.type'].create({'name': 'Tyres', 'category': 'service'})
+
+        def rollup(vehicle):
+            return {
+                (row.date.isoformat(), row.service_type_id): (row.amount, row.count)
+                for row in Rollup.search([('vehicle_id', '=', vehicle.id)])
+            }
+
+        first, second, cancelled = self.env['fleet.vehicle.log.services'].create([{
+            'vehicle_id': self.car.id,
+            'service_type_id': service_type.id,
+            'amount': amount,
+            'date': date,
+            'state': state,
+        } for amount, date, state in (
+            (100, '2024-03-10', 'new'),
+            (50, '2024-03-20', 'done'),
+            (1000, '2024-03-25', 'cancelled'),
+        )])
+        self.assertEqual(rollup(self.car), {('2024-03-01', service_type): (150, 2)})
+
+        first.amount = 120
+        cancelled.state = 'done'
+        self.assertEqual(rollup(self.car), {('2024-03-01', service_type): (1170, 3)})
+
+        cancelled.state = 'cancelled'
+        second.active = False
+        first.date = '2024-04-02'
+        self.assertEqual(rollup(self.car), {('2024-04-01', service_type): (120, 1)})
+
+        first.vehicle_id = self.other_car
+        self.assertFalse(rollup(self.car))
+        self.assertEqual(rollup(self.other_car), {('2024-04-01', service_type): (120, 1)})
+
+        second.active = True
+        first.unlink()
+        self.assertFalse(rollup(self.other_car))
+        self.assertEqual(rollup(self.car), {('2024-03-01', service_type): (50, 1)})
+        self.assertFalse(Rollup._verify_rollup())
+
+        self.Report._process_refresh_queue()
+        self.assertEqual(self._service_costs(self.car), {fields.Date.to_date('2024-03-01'): 50})
+
+        self.env.cr.execute("UPDATE fleet_vehicle_log_services_rollup SET amount = 0 WHERE vehicle_id = %s", [self.car.id])
+        self.assertEqual(len(Rollup._verify_rollup()), 1)
+        Rollup._rebuild_rollup()
+        self.assertFalse(Rollup._verify_rollup())
@@ -0,0 +1,80 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo import fields
+from odoo.tests import common
+
+
+class TestFleetDriverRotation(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        brand = cls.env["fleet.vehicle.model.brand"].create({"name": "Rotation"})
+        car_model, bike_model = cls.env["fleet.vehicle.model"].create([
+            {"brand_id": brand.id, "name": "Car", "vehicle_type": "car"},
+            {"brand_id": brand.id, "name": "Bike", "vehicle_type": "bike"},
+        ])
+        cls.driver_a, cls.driver_b, cls.driver_c = cls.env["res.partner"].create([
+            {"name": "Driver A"}, {"name": "Driver B"}, {"name": "Driver C"},
+        ])
+        cls.car_a, cls.bike_a, cls.car_b, cls.bike_b, cls.car_c = cls.env["fleet.vehicle"].create([
+            {"model_id": car_model.id, "driver_id": cls.driver_a.id},
+            {"model_id": bike_model.id, "driver_id": cls.driver_a.id},
+            {"model_id": car_model.id},
+            {"model_id": bike_model.id},
+            {"model_id": car_model.id, "driver_id": cls.driver_b.id},
+        ])
+        (cls.car_b | cls.bike_b).future_driver_id = cls.driver_a
+        cls.car_c.future_driver_id = cls.driver_c
+
+    def test_accept_driver_change(self):
+        today = fields.Date.today()
+        (self.car_b | self.bike_b | self.car_c).action_accept_driver_change()
+
+        self.assertFalse(self.car_a.driver_id)
+        self.assertFalse(self.bike_a.driver_id)
+        self.assertEqual(self.car_b.driver_id, self.driver_a)
+        self.assertEqual(self.bike_b.driver_id, self.driver_a)
+        self.assertEqual(self.car_c.driver_id, self.driver_c)
+        self.assertFalse((self.car_b | self.bike_b | self.car_c).future_driver_id)
+
+        for vehicle in (self.car_a, self.bike_a):
+            self.assertEqual(vehicle.log_drivers.date_end, today)
+        self.assertEqual(self.car_b.log_drivers.driver_id, self.driver_a)
+        self.assertFalse(self.car_b.log_drivers.date_end)
+        logs = self.car_c.log_drivers.sorted('id')
+        self.assertEqual(logs.driver_id, self.driver_b | self.driver_c)
+        self.assertEqual(logs.mapped('date_end'), [today, False])
+        self.assertEqual(len(self.car_c.activity_ids), 1, "The manager is asked to check the end date of the former driver")
+
+    def test_accept_without_future_driver(self):
+        self.car_a.action_accept_driver_change()
+        self.assertFalse(self.car_a.driver_id)
+        self.assertFalse(self.car_a.activity_ids, "No end date is asked without a future driver")
+        self.assertFalse(self.car_a.log_drivers.date_end)
+
+    def test_write_driver(self):
+        vehicles = self.car_a | self.car_b | self.car_c
+        vehicles.write({'driver_id': self.driver_b.id})
+        self.assertEqual(vehicles.driver_id, self.driver_b)
+        self.assertEqual(self.car_a.log_drivers.driver_id, self.driver_a | self.driver_b)
+        self.assertEqual(self.car_b.log_drivers.driver_id, self.driver_b)
+        self.assertEqual(len(self.car_c.log_drivers), 1, "The driver did not change")
+        self.assertEqual(len(self.car_a.activity_ids), 1)
+        self.assertFalse((self.car_b | self.car_c).activity_ids)
+
+    def test_stored_vehicle_type(self):
+        new_car = self.env["fleet.vehicle"].create({
+            "model_id": self.car_a.model_id.id,
+            "future_driver_id": self.driver_b.id,
+        })
+        self.assertEqual(new_car.vehicle_type, 'car')
+        self.assertTrue(self.car_c.plan_to_change_car, "The type of a new vehicle is taken from its model")
+
+        self.car_a.model_id.vehicle_type = 'bike'
+        self.env.cr.execute(
+            "SELECT id, vehicle_type FROM fleet_vehicle WHERE id IN %s",
+            [tuple((self.car_a | self.car_b | self.bike_a).ids)],
+        )
+        self.assertEqual(dict(self.env.cr.fetchall()), {
+            self.car_a.id: 'bike', self.car_b.id: 'bike', self.bike_a.id: 'bike',
+        }, "The stored type follows the model")
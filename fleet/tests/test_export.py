@@ -0,0 +1,73 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import csv
+import io
+import json
+
+from odoo.exceptions import UserError
+from odoo.tests import common
+
+
+class TestFleetExport(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        brand = cls.env["fleet.vehicle.model.brand"].create({"name": "Export"})
+        model = cls.env["fleet.vehicle.model"].create({"brand_id": brand.id, "name": "Extract"})
+        cls.vehicles = cls.env["fleet.vehicle"].create([
+            {"model_id": model.id, "license_plate": "EXP-%s" % i, "acquisition_date": "2024-01-15"} for i in range(7)
+        ])
+        cls.domain = [('model_id', '=', model.id)]
+
+    def test_export_chunks(self):
+        Vehicle = self.env['fleet.vehicle']
+        chunks = list(Vehicle._export_chunks(self.domain, ['license_plate', 'model_id'], chunk_size=3))
+        self.assertEqual([len(rows) for rows, _token in chunks], [3, 3, 1])
+        rows = [row for rows, _token in chunks for row in rows]
+        self.assertEqual([row['id'] for row in rows], self.vehicles.sorted('id').ids)
+        self.assertEqual(rows[0]['model_id'], self.vehicles.model_id.id)
+
+        resumed = list(Vehicle._export_chunks(self.domain, ['license_plate'], resume_token=chunks[0][1], chunk_size=3))
+        self.assertEqual([row['id'] for rows, _token in resumed for row in rows], self.vehicles.sorted('id').ids[3:])
+
+        with self.assertRaises(UserError):
+            list(self.env['fleet.vehicle.odometer']._export_chunks([], ['value'], resume_token=chunks[0][1]))
+
+    def test_export_writers(self):
+        Vehicle = self.env['fleet.vehicle']
+        file = io.StringIO()
+        token = Vehicle._export_jsonl(self.domain, ['license_plate', 'acquisition_date'], file, chunk_size=4)
+        lines = [json.loads(line) for line in file.getvalue().splitlines()]
+        self.assertEqual([line['license_plate'] for line in lines], self.vehicles.sorted('id').mapped('license_plate'))
+        self.assertEqual(lines[0]['acquisition_date'], '2024-01-15')
+        self.assertEqual(token, Vehicle._export_token(self.vehicles.sorted('id')[-1].id))
+
+        file = io.StringIO()
+        Vehicle._export_csv(self.domain, ['license_plate', 'tag_ids', 'driver_id'], file, chunk_size=4)
+        rows = list(csv.reader(io.StringIO(file.getvalue())))
+        self.assertEqual(rows[0], ['id', 'license_plate', 'tag_ids', 'driver_id'])
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[1][1:], [self.vehicles.sorted('id')[0].license_plate, '', ''])
+
+        attachment = Vehicle._export_attachment(self.domain, ['license_plate'], file_format='csv', name='vehicles.csv')
+        self.assertEqual(attachment.mimetype, 'text/csv')
+        self.assertEqual(len(attachment.raw.decode().splitlines()), 8)
+        self.assertEqual(attachment.file_size, len(attachment.raw))
+        self.assertEqual(attachment.checksum, attachment._compute_checksum(attachment.raw))
+
+    def test_export_chunk(self):
+        Vehicle = self.env['fleet.vehicle']
+        ids = self.vehicles.sorted('id').ids
+        chunk = Vehicle.export_chunk(self.domain, ['license_plate'], limit=4)
+        self.assertEqual([row['id'] for row in chunk['rows']], ids[:4])
+        self.assertEqual(chunk['next_token'], Vehicle._export_token(ids[3]))
+
+        chunk = Vehicle.export_chunk(self.domain, ['license_plate'], resume_token=chunk['next_token'], limit=4)
+        self.assertEqual([row['id'] for row in chunk['rows']], ids[4:])
+        self.assertFalse(chunk['next_token'], "The last chunk has no next token")
+
+        chunk = Vehicle.export_chunk(self.domain, ['license_plate'], resume_token=Vehicle._export_token(ids[-1]))
+        self.assertEqual(chunk, {'rows': [], 'next_token': False})
+
+        with self.assertRaises(UserError):
+            Vehicle.export_chunk(self.domain, ['license_plate'], limit=0)
@@ -0,0 +1,73 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import logging
+import statistics
+import time
+import unittest
+
+from odoo.tests import common, tagged
+
+from .common import FleetDataGenerator
+from .test_performance import benchmark_sizes
+
+_logger = logging.getLogger(__name__)
+
+
+class TestFleetNameSearch(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.brand = cls.env["fleet.vehicle.model.brand"].create({"name": "Skoda"})
+        cls.model = cls.env["fleet.vehicle.model"].create({"brand_id": cls.brand.id, "name": "Octavia"})
+        cls.driver = cls.env["res.partner"].create({"name": "Marguerite Lindqvist"})
+        cls.car = cls.env["fleet.vehicle"].create({
+            "model_id": cls.model.id,
+            "license_plate": "1-OCT-742",
+            "vin_sn": "TMBJJ7NE4L0123456",
+            "driver_id": cls.driver.id,
+        })
+
+    def _name_search(self, Model, value):
+        return Model.browse([id_ for id_, _name in Model.name_search(value)])
+
+    def test_vehicle_name_search(self):
+        Vehicle = self.env['fleet.vehicle']
+        for value in ('OCT-7', 'NE4L01', 'Octav', 'lindqv'):
+            self.assertIn(self.car, self._name_search(Vehicle, value), value)
+        self.assertNotIn(self.car, self._name_search(Vehicle, 'OCT-8'))
+
+    def test_model_name_search(self):
+        Model = self.env['fleet.vehicle.model']
+        self.assertIn(self.model, self._name_search(Model, 'kod'))
+        self.assertIn(self.model, self._name_search(Model, 'tavi'))
+        self.assertNotIn(self.model, self._name_search(Model, 'Fabia'))
+
+
+@tagged('post_install', '-at_install', '-standard', 'fleet_perf')
+class TestFleetNameSearchPerformance(common.TransactionCase):
+    """ Time the many2one autocompletion of vehicles on a large fleet. """
+
+    MAX_DURATION = 0.020
+
+    def test_vehicle_autocomplete(self):
+        if not self.env.registry.has_trigram:
+            raise unittest.SkipTest("pg_trgm is not installed")
+        Vehicle = self.env['fleet.vehicle']
+        generator = FleetDataGenerator(self.env)
+        brands = generator.brands(5)
+        vehicle_models = generator.models(brands, 10)
+        drivers = generator.drivers(100)
+        for size in benchmark_sizes('100000'):
+            vehicles = generator.vehicles(vehicle_models, drivers, size)
+            self.env.flush_all()
+            self.env.cr.execute("ANALYZE fleet_vehicle")
+            durations = []
+            for vehicle in vehicles[::max(size // 20, 1)]:
+                value = vehicle.license_plate[-5:]
+                self.env.invalidate_all()
+                start = time.perf_counter()
+                Vehicle.name_search(value, limit=8)
+                durations.append(time.perf_counter() - start)
+            duration = statistics.median(durations)
+            _logger.info("fleet.vehicle name_search() among %s vehicles: %.1fms", size, duration * 1000)
+            self.assertLess(duration, self.MAX_DURATION)
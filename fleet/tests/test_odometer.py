@@ -0,0 +1,123 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo.exceptions import UserError
+from odoo.tests import common
+from odoo import fields
+
+
+class TestFleetOdometer(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        brand = cls.env["fleet.vehicle.model.brand"].create({
+            "name": "Audi",
+        })
+        cls.model = cls.env["fleet.vehicle.model"].create({
+            "brand_id": brand.id,
+            "name": "A3",
+        })
+        cls.vehicles = cls.env["fleet.vehicle"].create([
+            {"model_id": cls.model.id, "license_plate": "ODO-%03d" % i}
+            for i in range(20)
+        ])
+
+    def test_last_odometer_maintained(self):
+        car = self.vehicles[0]
+        Odometer = self.env['fleet.vehicle.odometer']
+        self.assertEqual(car.odometer, 0)
+        self.assertFalse(car.last_odometer_date)
+
+        first = Odometer.create({
+            'vehicle_id': car.id,
+            'value': 1000,
+            'date': fields.Date.add(fields.Date.today(), days=-10),
+        })
+        self.assertEqual(car.last_odometer, 1000)
+        self.assertEqual(car.odometer, 1000)
+        self.assertEqual(car.last_odometer_date, first.date)
+
+        second = Odometer.create({
+            'vehicle_id': car.id,
+            'value': 1500,
+            'date': fields.Date.today(),
+        })
+        self.assertEqual(car.odometer, 1500)
+        self.assertEqual(car.last_odometer_date, second.date)
+
+        second.value = 800
+        self.assertEqual(car.odometer, 1000)
+        self.assertEqual(car.last_odometer_date, first.date)
+
+        first.unlink()
+        self.assertEqual(car.odometer, 800)
+        second.unlink()
+        self.assertEqual(car.odometer, 0)
+        self.assertFalse(car.last_odometer_date)
+
+    def test_odometer_inverse_and_monotonic_check(self):
+        car = self.vehicles[0]
+        car.odometer = 500
+        self.assertEqual(car.last_odometer, 500)
+        self.assertEqual(car.last_odometer_date, fields.Date.context_today(car))
+        with self.assertRaises(UserError):
+            car.write({'odometer': 100})
+
+    def test_odometer_query_count(self):
+        """ Resolving the last odometer of a recordset must not issue one
+        query per vehicle. """
+        self.env['fleet.vehicle.odometer'].create([
+            {'vehicle_id': vehicle.id, 'value': value * 100}
+            for vehicle in self.vehicles
+            for value in range(1, 4)
+        ])
+
+        def count_queries(vehicles, operation):
+            self.env.invalidate_all()
+            queries_before = self.cr.sql_log_count
+            operation(vehicles)
+            return self.cr.sql_log_count - queries_before
+
+        def read_odometer(vehicles):
+            vehicles.mapped('odometer')
+
+        def resolve_odometer(vehicles):
+            vehicles._read_last_odometer()
+
+        def check_odometer(vehicles):
+            vehicles.write({'odometer': 1000})
+
+        for operation in (read_odometer, resolve_odometer):
+            small = count_queries(self.vehicles[:2], operation)
+            large = count_queries(self.vehicles, operation)
+            self.assertEqual(small, large, "%s should not depend on the number of vehicles" % operation.__name__)
+
+        self.assertEqual(self.vehicles[:5]._read_last_odometer(), {
+            vehicle.id: (300, fields.Date.context_today(vehicle)) for vehicle in self.vehicles[:5]
+        })
+        small = count_queries(self.vehicles[:2], check_odometer)
+        large = count_queries(self.vehicles[2:], check_odometer)
+        self.assertEqual(small, large, "The odometer check on write should not depend on the number of vehicles")
+
+    def test_odometer_report_refresh(self):
+        car, other_car = self.vehicles[:2]
+        Report = self.env['fleet.vehicle.odometer.report']
+        Odometer = self.env['fleet.vehicle.odometer']
+        Odometer.create([
+            {'vehicle_id': vehicle.id, 'value': value, 'date': date}
+            for vehicle in (car, other_car)
+            for value, date in ((1000, '2024-01-10'), (2000, '2024-03-10'))
+        ])
+        Report._rebuild_report()
+        car_rows = Report.search([('vehicle_id', '=', car.id)])
+        other_rows = Report.search([('vehicle_id', '=', other_car.id)])
+        self.assertTrue(car_rows)
+        self.assertAlmostEqual(max(car_rows.mapped('odometer_value')), 2000)
+
+        Odometer.create({'vehicle_id': car.id, 'value': 2600, 'date': '2024-04-10'})
+        self.assertAlmostEqual(max(Report.search([('vehicle_id', '=', car.id)]).mapped('odometer_value')), 2000)
+
+        car.action_open_odometer_report()
+        new_car_rows = Report.search([('vehicle_id', '=', car.id)])
+        self.assertAlmostEqual(max(new_car_rows.mapped('odometer_value')), 2600)
+        self.assertLess(car_rows, new_car_rows, "Rows of the refreshed months keep their ids")
+        self.assertEqual(Report.search([('vehicle_id', '=', other_car.id)]), other_rows)
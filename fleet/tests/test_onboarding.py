@@ -0,0 +1,45 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from unittest.mock import patch
+
+from odoo.tests import common
+
+
+class TestFleetOnboarding(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.brand = cls.env["fleet.vehicle.model.brand"].create({"name": "Onboarding Motors"})
+        cls.model = cls.env["fleet.vehicle.model"].create({"brand_id": cls.brand.id, "name": "Lease", "default_co2": 95})
+        cls.driver = cls.env["res.partner"].create({"name": "Onboarded Driver"})
+
+    def test_onboard_vehicles(self):
+        rows = [
+            {'brand': 'Onboarding Motors', 'model': 'Lease', 'license_plate': 'ONB-0', 'driver_id': self.driver.id},
+            {'brand': 'Onboarding Motors', 'model': 'Unknown', 'license_plate': 'ONB-1'},
+            {'model_id': self.model.id, 'license_plate': 'ONB-2'},
+            {'brand': 'Onboarding Motors', 'model': 'Lease', 'license_plate': 'ONB-3', 'fuel_type': 'steam'},
+            {'brand': 'Onboarding Motors', 'model': 'Lease', 'license_plate': 'ONB-4'},
+        ]
+        result = self.env['fleet.vehicle']._onboard_vehicles(iter(rows), chunk_size=2)
+        vehicles = result['vehicles']
+        self.assertEqual(vehicles.mapped('license_plate'), ['ONB-0', 'ONB-2', 'ONB-4'])
+        self.assertEqual([index for index, _message in result['errors']], [1, 3])
+        self.assertEqual(set(vehicles.mapped('co2')), {95}, "The specifications of the models are loaded")
+        self.assertEqual(vehicles[0].log_drivers.driver_id, self.driver)
+        self.assertFalse(vehicles.message_ids, "Vehicles are onboarded without chatter")
+        self.assertEqual(len(self.model.message_ids.filtered(lambda m: 'onboarded' in m.body)), 1)
+
+    def test_onboard_missing_models(self):
+        result = self.env['fleet.vehicle']._onboard_vehicles([
+            {'brand': 'New Brand', 'model': 'New Model', 'license_plate': 'NEW-%s' % i} for i in range(3)
+        ], create_missing=True)
+        self.assertFalse(result['errors'])
+        self.assertEqual(len(result['vehicles'].model_id), 1)
+        self.assertEqual(result['vehicles'].model_id.brand_id.name, 'New Brand')
+
+    def test_onboard_unexpected_error(self):
+        """ Only the errors of invalid rows are reported, others propagate. """
+        Vehicle = type(self.env['fleet.vehicle'])
+        with patch.object(Vehicle, 'create', side_effect=KeyError('bug')), self.assertRaises(KeyError):
+            self.env['fleet.vehicle']._onboard_vehicles([{'model_id': self.model.id, 'license_plate': 'BUG-1'}])
@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
+from unittest.mock import patch
+
+from freezegun import freeze_time
+
 from odoo.tests import common, new_test_user
 from odoo import fields
 
@@ -75,3 +79,155 @@ class TestFleet(common.TransactionCase):
 
         res = self.env["fleet.vehicle"].search([('contract_renewal_overdue', '=', True), ('id', '=', car_1.id)])
         self.assertFalse(res)
+
+    def test_contract_reminder_date_rollover(self):
+        """
+            The stored reminder follows the date through the daily job and the
+            alert delay through the settings
+        """
+        brand = self.env["fleet.vehicle.model.brand"].create({
+            "name": "Audi",
+        })
+        model = self.env["fleet.vehicle.model"].create({
+            "brand_id": brand.id,
+            "name": "A3",
+        })
+        car = self.env["fleet.vehicle"].create({
+            "model_id": model.id,
+        })
+        today = fields.Date.today()
+        self.env['fleet.vehicle.log.contract'].create({
+            'vehicle_id': car.id,
+            'start_date': fields.Date.add(today, days=-30),
+            'expiration_date': fields.Date.add(today, days=40),
+        })
+        self.assertFalse(car.contract_renewal_due_soon)
+        self.assertFalse(car.contract_renewal_overdue)
+        self.assertEqual(car.contract_state, 'open')
+
+        self.env['res.config.settings'].create({'delay_alert_contract': 60}).execute()
+        self.assertTrue(car.contract_renewal_due_soon)
+        self.env['res.config.settings'].create({'delay_alert_contract': 30}).execute()
+        self.assertFalse(car.contract_renewal_due_soon)
+
+        with freeze_time(fields.Date.add(today, days=20)):
+            self.env['fleet.vehicle']._cron_refresh_contract_reminder()
+            self.assertTrue(car.contract_renewal_due_soon)
+            self.assertFalse(car.contract_renewal_overdue)
+            self.assertEqual(self.env['fleet.vehicle'].search([('contract_renewal_due_soon', '=', True), ('id', '=', car.id)]), car)
+
+        with freeze_time(fields.Date.add(today, days=41)):
+            self.env['fleet.vehicle']._cron_refresh_contract_reminder()
+            self.assertFalse(car.contract_renewal_due_soon)
+            self.assertTrue(car.contract_renewal_overdue)
+            self.assertEqual(self.env['fleet.vehicle'].search([('contract_renewal_overdue', '=', True), ('id', '=', car.id)]), car)
+
+    def test_contract_expiration_scheduler_batches(self):
+        """ The scheduler processes the contracts in chunks, schedules a single
+        renewal activity per contract, and skips the contracts processed by
+        an interrupted run. """
+        brand = self.env["fleet.vehicle.model.brand"].create({
+            "name": "Audi",
+        })
+        model = self.env["fleet.vehicle.model"].create({
+            "brand_id": brand.id,
+            "name": "A3",
+        })
+        car = self.env["fleet.vehicle"].create({
+            "model_id": model.id,
+        })
+        today = fields.Date.today()
+        Log = self.env['fleet.vehicle.log.contract']
+        expiring = Log.create([{
+            'vehicle_id': car.id,
+            'user_id': self.env.uid,
+            'start_date': fields.Date.add(today, days=-300),
+            'expiration_date': fields.Date.add(today, days=5 + i),
+        } for i in range(5)])
+        expired = Log.create({
+            'vehicle_id': car.id,
+            'start_date': fields.Date.add(today, days=-400),
+            'expiration_date': fields.Date.add(today, days=-10),
+        })
+        expired.state = 'open'
+        params = self.env['ir.config_parameter'].sudo()
+        params.set_param('fleet.contract_expiration_batch_size', 2)
+        renew_type = self.env.ref('fleet.mail_act_fleet_contract_to_renew')
+
+        # an interrupted run stopped after the first chunk
+        with patch.object(type(self.env['ir.cron']), '_commit_progress', return_value=False):
+            self.assertFalse(Log.scheduler_manage_contract_expiration())
+        self.assertEqual(expiring[:2].activity_ids.activity_type_id, renew_type)
+        self.assertFalse(expiring[2:].activity_ids)
+
+        self.assertTrue(Log.scheduler_manage_contract_expiration())
+        self.assertEqual(expired.state, 'expired')
+
+        Log.scheduler_manage_contract_expiration()
+        for contract in expiring:
+            self.assertEqual(len(contract.activity_ids), 1)
+            self.assertEqual(contract.activity_ids.date_deadline, contract.expiration_date)
+
+    def test_run_scheduler_out_of_time(self):
+        """ The ledger is not extended when the expiration scheduler stops
+        before processing every contract, the cron being out of time. """
+        Log = type(self.env['fleet.vehicle.log.contract'])
+        with patch.object(Log, 'scheduler_manage_contract_expiration', return_value=False), \
+             patch.object(Log, '_extend_cost_ledger') as extend_cost_ledger:
+            self.env['fleet.vehicle.log.contract'].run_scheduler()
+        extend_cost_ledger.assert_not_called()
+
+        with patch.object(Log, 'scheduler_manage_contract_expiration', return_value=True), \
+             patch.object(Log, '_extend_cost_ledger') as extend_cost_ledger:
+            self.env['fleet.vehicle.log.contract'].run_scheduler()
+        extend_cost_ledger.assert_called_once()
+
+    def test_contract_state_reconciliation(self):
+        brand = self.env["fleet.vehicle.model.brand"].create({
+            "name": "Audi",
+        })
+        model = self.env["fleet.vehicle.model"].create({
+            "brand_id": brand.id,
+            "name": "A3",
+        })
+        car = self.env["fleet.vehicle"].create({
+            "model_id": model.id,
+        })
+        today = fields.Date.today()
+        contracts = self.env['fleet.vehicle.log.contract'].create([{
+            'vehicle_id': car.id,
+            'start_date': fields.Date.add(today, days=-10),
+            'expiration_date': fields.Date.add(today, days=10),
+        } for _i in range(3)])
+        closed = contracts[2]
+        closed.action_close()
+
+        contracts.write({'start_date': fields.Date.add(today, days=5)})
+        self.assertEqual(contracts.mapped('state'), ['futur', 'futur', 'closed'])
+
+        contracts.write({'start_date': fields.Date.add(today, days=-30), 'expiration_date': fields.Date.add(today, days=-1)})
+        self.assertEqual(contracts.mapped('state'), ['expired', 'expired', 'closed'])
+
+        contracts[0].expiration_date = fields.Date.add(today, days=30)
+        self.assertEqual(contracts.mapped('state'), ['open', 'expired', 'closed'])
+
+        # the scheduler does not reopen expired contracts, it only follows the time
+        contracts[1].write({'state': 'expired'})
+        contracts[1].flush_recordset()
+        self.env.cr.execute(
+            "UPDATE fleet_vehicle_log_contract SET expiration_date = %s WHERE id = %s",
+            [fields.Date.add(today, days=30), contracts[1].id],
+        )
+        contracts.invalidate_recordset()
+        self.assertFalse(contracts._reconcile_state())
+        self.assertEqual(contracts.mapped('state'), ['open', 'expired', 'closed'])
+
+        # writing the dates does not change the state of a contract without start date
+        undated = self.env['fleet.vehicle.log.contract'].create({
+            'vehicle_id': car.id,
+            'start_date': False,
+            'expiration_date': fields.Date.add(today, days=10),
+        })
+        self.assertEqual(undated.state, 'open')
+        undated.expiration_date = fields.Date.add(today, days=-1)
+        self.assertEqual(undated.state, 'open')
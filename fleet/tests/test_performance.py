@@ -0,0 +1,237 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import logging
+import math
+import os
+import time
+
+from odoo.models import PREFETCH_MAX
+from odoo.tests import common, tagged
+
+from .common import FleetDataGenerator
+
+_logger = logging.getLogger(__name__)
+
+
+def benchmark_sizes(default='1000,10000'):
+    """ Sizes of the batches used by the benchmarks, overridable through the
+    ``FLEET_BENCHMARK_SIZES`` environment variable (e.g. ``1000,10000,100000``). """
+    return [int(size) for size in os.environ.get('FLEET_BENCHMARK_SIZES', default).split(',') if size]
+
+
+@tagged('post_install', '-at_install', '-standard', 'fleet_perf')
+class TestFleetPerformance(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        brand = cls.env["fleet.vehicle.model.brand"].create({
+            "name": "Audi",
+        })
+        category = cls.env["fleet.vehicle.model.category"].create({
+            "name": "Benchmark",
+        })
+        cls.vehicle_models = cls.env["fleet.vehicle.model"].create([
+            {
+                "brand_id": brand.id,
+                "name": "A%s" % i,
+                "category_id": category.id,
+                "transmission": "automatic",
+                "color": "Blue",
+                "seats": 5,
+                "doors": 5,
+                "default_co2": 100 + i,
+                "co2_standard": "WLTP",
+                "default_fuel_type": "gasoline",
+                "power": 80,
+                "horsepower": 110,
+                "horsepower_tax": 6,
+                "vehicle_range": 600,
+            } for i in range(10)
+        ])
+
+    def _timed(self, operation):
+        start = time.perf_counter()
+        result = operation()
+        return result, time.perf_counter() - start
+
+    def test_create_model_specifications(self):
+        Vehicle = self.env['fleet.vehicle'].with_context(tracking_disable=True)
+        spec_fields = list(Vehicle._get_model_fields_to_vehicle().values())
+        for size in benchmark_sizes():
+            vals_list = [
+                {"model_id": self.vehicle_models[i % len(self.vehicle_models)].id, "license_plate": "BENCH-%s" % i}
+                for i in range(size)
+            ]
+            vehicles, create_time = self._timed(lambda: Vehicle.create(vals_list))
+            vehicles.flush_recordset()
+            model = self.vehicle_models[0]
+            sample = vehicles.filtered(lambda v: v.model_id == model)[:1]
+            self.assertEqual(sample.category_id, model.category_id)
+            self.assertEqual(sample.co2, model.default_co2)
+            self.assertEqual(sample.fuel_type, model.default_fuel_type)
+
+            # compare one pass over every specification with the former
+            # per-field computation, on the same batch
+            self.env.invalidate_all()
+            with self.env.protecting([Vehicle._fields[fname] for fname in spec_fields], vehicles):
+                _dummy, legacy_time = self._timed(lambda: [
+                    vehicles._load_fields_from_model([fname]) for fname in spec_fields
+                ])
+            self.env.invalidate_all()
+            with self.env.protecting([Vehicle._fields[fname] for fname in spec_fields], vehicles):
+                _dummy, single_pass_time = self._timed(lambda: vehicles._load_fields_from_model())
+            _logger.info(
+                "fleet.vehicle create() of %s vehicles: %.3fs; model specifications: "
+                "%.3fs for one pass, %.3fs for one pass per field (x%.1f)",
+                size, create_time, single_pass_time, legacy_time, legacy_time / (single_pass_time or 1e-9),
+            )
+            self.assertLess(single_pass_time, legacy_time)
+
+    def test_onboard_vehicles(self):
+        Vehicle = self.env['fleet.vehicle']
+        drivers = self.env['res.partner'].create([{'name': 'Onboarding %s' % i} for i in range(100)])
+        for size in benchmark_sizes('1000,10000,20000'):
+            rows = (
+                {
+                    'brand': 'Onboarding Benchmark',
+                    'model': 'Lease %s' % (i % 10),
+                    'license_plate': 'ONB-%s-%s' % (size, i),
+                    'driver_id': drivers[i % len(drivers)].id,
+                } for i in range(size)
+            )
+            result, onboarding_time = self._timed(lambda: Vehicle._onboard_vehicles(rows, create_missing=True))
+            self.env.flush_all()
+            self.assertEqual(len(result['vehicles']), size)
+            self.assertFalse(result['errors'])
+            _logger.info(
+                "fleet.vehicle _onboard_vehicles() of %s vehicles: %.3fs (%.0f vehicles/s)",
+                size, onboarding_time, size / (onboarding_time or 1e-9),
+            )
+
+    def test_report_upgrade_cost(self):
+        """ Upgrading the module must not evaluate the report queries, so its
+        cost does not depend on the number of vehicles and readings. """
+        reports = [self.env['fleet.vehicle.cost.report'], self.env['fleet.vehicle.odometer.report']]
+        Vehicle = self.env['fleet.vehicle'].with_context(tracking_disable=True)
+        results = []
+        for size in benchmark_sizes():
+            vehicles = Vehicle.create([
+                {"model_id": self.vehicle_models[i % len(self.vehicle_models)].id, "license_plate": "UPG-%s-%s" % (size, i)}
+                for i in range(size)
+            ])
+            self.env['fleet.vehicle.odometer'].create([
+                {'vehicle_id': vehicle.id, 'value': value * 1000, 'date': '2024-%02d-01' % value}
+                for vehicle in vehicles
+                for value in range(1, 4)
+            ])
+            self.env.flush_all()
+            queries_before = self.cr.sql_log_count
+            _dummy, upgrade_time = self._timed(lambda: [report.init() for report in reports])
+            queries = self.cr.sql_log_count - queries_before
+            _logger.info("fleet reports upgrade with %s vehicles: %.3fs, %s queries", size, upgrade_time, queries)
+            results.append((queries, upgrade_time))
+        self.assertEqual(len({queries for queries, _time in results}), 1)
+        self.assertLess(max(upgrade_time for _queries, upgrade_time in results), 1)
+
+
+LIST_SPECIFICATION = {
+    'license_plate': {},
+    'model_id': {'fields': {'display_name': {}}},
+    'category_id': {'fields': {'display_name': {}}},
+    'driver_id': {'fields': {'display_name': {}}},
+    'future_driver_id': {'fields': {'display_name': {}}},
+    'acquisition_date': {},
+    'tag_ids': {'fields': {'display_name': {}, 'color': {}}},
+    'contract_renewal_due_soon': {},
+    'contract_renewal_overdue': {},
+    'contract_state': {},
+    'activity_exception_decoration': {},
+}
+
+KANBAN_SPECIFICATION = {
+    'license_plate': {},
+    'model_id': {'fields': {'display_name': {}}},
+    'driver_id': {'fields': {'display_name': {}}},
+    'future_driver_id': {'fields': {'display_name': {}}},
+    'tag_ids': {'fields': {'display_name': {}, 'color': {}}},
+    'location': {},
+    'contract_count': {},
+    'contract_renewal_due_soon': {},
+    'contract_renewal_overdue': {},
+    'service_activity': {},
+    'activity_ids': {},
+    'activity_state': {},
+}
+
+
+@tagged('post_install', '-at_install', '-standard', 'fleet_perf')
+class TestFleetBenchmark(common.TransactionCase):
+    """ Time the main fleet operations on generated fleets of every size of
+    ``benchmark_sizes()``, and fail when an operation issues more queries
+    than its budget, like ``assertQueryCount()``. The budget of an operation
+    is a number of queries, plus a number of queries per batch of
+    ``PREFETCH_MAX`` vehicles for the operations processing the vehicles by
+    batches; operations independent from the number of vehicles have no
+    queries per batch. """
+
+    def _measure(self, operation):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries_before = self.cr.sql_log_count
+        start = time.perf_counter()
+        operation()
+        duration = time.perf_counter() - start
+        queries = self.cr.sql_log_count - queries_before
+        # drop the values computed by the operation instead of flushing them
+        self.env.invalidate_all(flush=False)
+        return queries, duration
+
+    def _get_benchmarks(self, generator, vehicles):
+        """ Return the benchmarks as (name, operation, queries, batch_queries)
+        tuples, where ``queries`` and ``batch_queries`` are the budget of the
+        operation: at most ``queries`` queries, plus ``batch_queries`` per
+        batch of ``PREFETCH_MAX`` vehicles. """
+        Vehicle = self.env['fleet.vehicle']
+        CostReport = self.env['fleet.vehicle.cost.report']
+        OdometerReport = self.env['fleet.vehicle.odometer.report']
+        new_driver = generator.drivers(1)
+        vehicle_models = vehicles.model_id
+        return [
+            ('create', lambda: generator.vehicles(vehicle_models, new_driver, len(vehicles)), 40, 30),
+            ('write(driver_id)', lambda: vehicles.write({'driver_id': new_driver.id}), 40, 20),
+            ('_compute_count_all', lambda: vehicles._compute_count_all(), 15, 2),
+            ('_compute_contract_reminder', lambda: vehicles._compute_contract_reminder(), 5, 2),
+            ('list read', lambda: Vehicle.web_search_read([], LIST_SPECIFICATION, limit=80), 30, 0),
+            ('kanban read', lambda: Vehicle.web_search_read([], KANBAN_SPECIFICATION, limit=80), 30, 0),
+            ('cost report refresh', lambda: CostReport._refresh_report(), 10, 0),
+            ('cost report read', lambda: CostReport._read_group(
+                [], ['date_start:month', 'cost_type'], ['cost:sum']), 5, 0),
+            ('odometer report refresh', lambda: OdometerReport._refresh_report(), 10, 0),
+            ('odometer report read', lambda: OdometerReport._read_group(
+                [], ['recorded_date:month', 'vehicle_id'], ['mileage_delta:sum']), 5, 0),
+            ('scheduler_manage_contract_expiration',
+             lambda: self.env['fleet.vehicle.log.contract'].scheduler_manage_contract_expiration(), 20, 15),
+        ]
+
+    def test_fleet_benchmark(self):
+        for size in benchmark_sizes():
+            generator = FleetDataGenerator(self.env, seed=size)
+            vehicles, generation_time = self._measure_generation(generator, size)
+            _logger.info("fleet benchmark: generated %s vehicles in %.3fs", size, generation_time)
+            batches = math.ceil(size / PREFETCH_MAX)
+            for name, operation, expected, batch_queries in self._get_benchmarks(generator, vehicles):
+                queries, duration = self._measure(operation)
+                _logger.info("fleet benchmark: %s on %s vehicles: %.3fs, %s queries", name, size, duration, queries)
+                budget = expected + batch_queries * batches
+                with self.subTest(benchmark=name, size=size):
+                    self.assertLessEqual(
+                        queries, budget,
+                        "%s issued %s queries for %s vehicles, instead of at most %s"
+                        % (name, queries, size, budget),
+                    )
+
+    def _measure_generation(self, generator, size):
+        start = time.perf_counter()
+        vehicles = generator.fleet(size)
+        self.env.flush_all()
+        return vehicles, time.perf_counter() - start
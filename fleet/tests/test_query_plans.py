@@ -0,0 +1,99 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import json
+from unittest.mock import patch
+
+from odoo.sql_db import Cursor
+from odoo.tests import common, tagged
+from odoo.tools import SQL
+
+from .common import FleetDataGenerator
+from .test_performance import benchmark_sizes
+
+
+@tagged('post_install', '-at_install', '-standard', 'fleet_perf')
+class TestFleetQueryPlans(common.TransactionCase):
+    """ Seed a large fleet, then EXPLAIN the queries issued by the hot paths
+    of the module, and fail when one of them scans a large table
+    sequentially. """
+
+    LARGE_TABLES = {
+        'fleet_vehicle',
+        'fleet_vehicle_odometer',
+        'fleet_vehicle_assignation_log',
+        'fleet_vehicle_log_contract',
+        'fleet_vehicle_log_contract_cost',
+        'fleet_vehicle_log_services',
+        'fleet_vehicle_log_services_rollup',
+        'fleet_vehicle_cost_report',
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        size = max(benchmark_sizes('10000'))
+        cls.vehicles = FleetDataGenerator(cls.env, seed=size).fleet(size)
+        cls.env['fleet.vehicle.cost.report']._rebuild_report()
+        cls.env.flush_all()
+        for table in cls.LARGE_TABLES:
+            cls.env.cr.execute(SQL("ANALYZE %s", SQL.identifier(table)))
+
+    def _get_hot_paths(self):
+        """ Return the hot paths as (name, operation) pairs. """
+        vehicle = self.vehicles[len(self.vehicles) // 2]
+        driver = self.vehicles.driver_id[:1]
+        Vehicle = self.env['fleet.vehicle']
+        Contract = self.env['fleet.vehicle.log.contract']
+        return [
+            ('last odometer', lambda: vehicle._read_last_odometer()),
+            ('odometer history', lambda: vehicle.log_odometers.mapped('value')),
+            ('driver history', lambda: vehicle.log_drivers.mapped('date_start')),
+            ('vehicle services', lambda: vehicle.log_services.mapped('amount')),
+            ('vehicle contracts', lambda: vehicle.log_contracts.mapped('state')),
+            ('driver vehicles', lambda: Vehicle.search([('driver_id', 'in', driver.ids), ('vehicle_type', '=', 'car')])),
+            ('future driver vehicles', lambda: Vehicle.search([('future_driver_id', '=', driver.id)])),
+            ('contract renewals', lambda: Contract._schedule_renewal_activities(100, SQL("TRUE"))),
+            ('contract costs', lambda: self.env['fleet.vehicle.log.contract.cost'].search([('vehicle_id', '=', vehicle.id)])),
+            ('service costs', lambda: self.env['fleet.vehicle.log.services.rollup'].search([('vehicle_id', '=', vehicle.id)])),
+            ('cost report', lambda: self.env['fleet.vehicle.cost.report'].search([('vehicle_id', '=', vehicle.id)])),
+        ]
+
+    def _capture_queries(self, operation):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = []
+        execute = Cursor.execute
+
+        def capture(cr, query, params=None, log_exceptions=True):
+            if isinstance(query, SQL):
+                queries.append((query.code, query.params))
+            else:
+                queries.append((query, params))
+            return execute(cr, query, params, log_exceptions)
+
+        with patch.object(Cursor, 'execute', capture):
+            operation()
+            self.env.flush_all()
+        return queries
+
+    def _get_seq_scans(self, plan):
+        if plan.get('Node Type') == 'Seq Scan' and plan.get('Relation Name') in self.LARGE_TABLES:
+            yield plan['Relation Name']
+        for subplan in plan.get('Plans', []):
+            yield from self._get_seq_scans(subplan)
+
+    def test_hot_paths_use_indexes(self):
+        for name, operation in self._get_hot_paths():
+            for query, params in self._capture_queries(operation):
+                if not query.lstrip().upper().startswith(('SELECT', 'WITH', 'UPDATE', 'DELETE')):
+                    continue
+                if not any(table in query for table in self.LARGE_TABLES):
+                    continue
+                self.env.cr.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+                plan = self.env.cr.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                with self.subTest(hot_path=name, query=query):
+                    self.assertFalse(
+                        list(self._get_seq_scans(plan[0]['Plan'])),
+                        "%s scans a large table sequentially:\n%s" % (name, query),
+                    )
@@ -0,0 +1,76 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo.tests import common
+
+
+class TestFleetSendMail(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        brand = cls.env["fleet.vehicle.model.brand"].create({"name": "Mailing"})
+        model = cls.env["fleet.vehicle.model"].create({"brand_id": brand.id, "name": "Mailing"})
+        cls.driver, cls.other_driver = cls.env["res.partner"].create([
+            {"name": "Driver", "email": "driver@example.com"},
+            {"name": "Other Driver", "email": "other.driver@example.com"},
+        ])
+        cls.vehicles = cls.env["fleet.vehicle"].create([
+            {"model_id": model.id, "license_plate": "MAIL-%s" % i, "driver_id": driver.id}
+            for i, driver in enumerate((cls.driver, cls.driver, cls.other_driver))
+        ])
+        cls.vehicle_without_driver = cls.env["fleet.vehicle"].create({"model_id": model.id, "license_plate": "MAIL-NONE"})
+
+    def _send(self, group_by_driver=False):
+        wizard = self.env['fleet.vehicle.send.mail'].create({
+            'vehicle_ids': self.vehicles.ids,
+            'subject': 'Rotation',
+            'body': '<p>Your vehicle changes next week.</p>',
+            'group_by_driver': group_by_driver,
+        })
+        wizard.action_send()
+        return wizard
+
+    def _messages(self):
+        return self.env['mail.message'].search([
+            ('model', '=', 'fleet.vehicle'), ('res_id', 'in', self.vehicles.ids), ('subject', '=', 'Rotation'),
+        ])
+
+    def test_send_mail_job(self):
+        wizard = self._send()
+        job = wizard.job_id
+        self.assertEqual(job.state, 'queued')
+        self.assertEqual(job.message_count, 3)
+        self.assertFalse(self._messages(), "The messages are sent in the background")
+
+        wizard.action_send()
+        self.assertEqual(wizard.job_id, job, "Sending again does not create another job")
+
+        job._process_job(chunk_size=2)
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(wizard.job_progress, 100)
+        messages = self._messages()
+        self.assertEqual(len(messages), 3)
+        self.assertEqual(job.line_ids.message_id, messages)
+
+        job.state = 'running'
+        job._process_job(chunk_size=2)
+        self.assertEqual(len(self._messages()), 3, "A restarted job does not send the sent messages again")
+
+    def test_send_mail_job_group_by_driver(self):
+        job = self._send(group_by_driver=True).job_id
+        self.env['fleet.vehicle.send.mail.job']._process_jobs()
+        messages = self._messages()
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages.partner_ids, self.driver | self.other_driver)
+
+    def test_send_mail_job_without_driver(self):
+        self.vehicles |= self.vehicle_without_driver
+        for group_by_driver in (False, True):
+            job = self._send(group_by_driver=group_by_driver).job_id
+            job._process_job(chunk_size=10)
+            line = job.line_ids.filtered(lambda line: line.vehicle_id == self.vehicle_without_driver)
+            self.assertTrue(line.message_id, "The message is logged on a vehicle without driver")
+            self.assertFalse(line.partner_id)
+            self.assertFalse(line.message_id.partner_ids)
+            self.assertEqual(job.message_count, 3 if group_by_driver else 4)
+            job.unlink()
@@ -0,0 +1,40 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo import fields
+from odoo.tests import common
+
+
+class TestFleetServiceActivity(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        brand = cls.env["fleet.vehicle.model.brand"].create({"name": "Servicing"})
+        model = cls.env["fleet.vehicle.model"].create({"brand_id": brand.id, "name": "Garage"})
+        cls.car = cls.env["fleet.vehicle"].create({"model_id": model.id})
+        cls.service = cls.env["fleet.vehicle.log.services"].create({"vehicle_id": cls.car.id})
+        cls.yesterday = fields.Date.add(fields.Date.context_today(cls.service), days=-1)
+
+    def _service_activity(self):
+        self.car.invalidate_recordset(['service_activity'])
+        return self.car.service_activity
+
+    def test_service_activity(self):
+        self.assertEqual(self._service_activity(), 'none')
+        activity = self.service.activity_schedule('mail.mail_activity_data_todo', self.yesterday, user_id=self.env.uid)
+        self.assertEqual(self._service_activity(), 'overdue')
+
+        activity.active = False
+        self.assertEqual(self._service_activity(), 'none', "Archived activities do not count")
+
+        activity.active = True
+        self.service.active = False
+        self.assertEqual(self._service_activity(), 'none', "The activities of archived services do not count")
+
+    def test_service_activity_other_model(self):
+        """ An activity of another model on a record having the id of a
+        service is not an activity of that service. """
+        activity = self.car.activity_schedule('mail.mail_activity_data_todo', self.yesterday, user_id=self.env.uid)
+        activity.flush_recordset()
+        self.env.cr.execute("UPDATE mail_activity SET res_id = %s WHERE id = %s", [self.service.id, activity.id])
+        activity.invalidate_recordset()
+        self.assertEqual(self._service_activity(), 'none')
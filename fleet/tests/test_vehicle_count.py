@@ -0,0 +1,53 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo.tests import common
+
+
+class TestFleetVehicleCount(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.brand = cls.env["fleet.vehicle.model.brand"].create({"name": "Counting"})
+        cls.empty, cls.single, cls.double = cls.env["fleet.vehicle.model"].create([
+            {"brand_id": cls.brand.id, "name": name} for name in ("Empty", "Single", "Double")
+        ])
+        cls.env["fleet.vehicle"].create([
+            {"model_id": cls.single.id},
+            {"model_id": cls.double.id},
+            {"model_id": cls.double.id},
+        ])
+        cls.env["fleet.vehicle"].create({"model_id": cls.empty.id, "active": False})
+
+    def _search(self, operator, value):
+        return self.env['fleet.vehicle.model'].search([
+            ('brand_id', '=', self.brand.id), ('vehicle_count', operator, value),
+        ])
+
+    def test_search_vehicle_count(self):
+        for operator, value, expected in [
+            ('=', 0, self.empty),
+            ('=', 2, self.double),
+            ('!=', 0, self.single | self.double),
+            ('!=', 1, self.empty | self.double),
+            ('>', 0, self.single | self.double),
+            ('>=', 2, self.double),
+            ('<', 2, self.empty | self.single),
+            ('<=', 0, self.empty),
+            ('in', [0, 2], self.empty | self.double),
+            ('in', [1], self.single),
+            ('not in', [0], self.single | self.double),
+            ('not in', [1, 2], self.empty),
+            ('!=', False, self.single | self.double),
+        ]:
+            with self.subTest(operator=operator, value=value):
+                self.assertEqual(self._search(operator, value), expected)
+                self.assertEqual(expected.filtered_domain([('vehicle_count', operator, value)]), expected)
+
+    def test_brand_vehicle_count(self):
+        self.assertEqual(self.brand.vehicle_count, 3)
+        self.assertEqual(self.brand.model_count, 3)
+        self.env['fleet.vehicle'].search([('model_id', '=', self.single.id)]).active = False
+        self.assertEqual(self.brand.vehicle_count, 2)
+        brands = self.env['fleet.vehicle.model.brand'].search(
+            [('id', '=', self.brand.id), ('vehicle_count', '>', 1)], order='vehicle_count desc')
+        self.assertEqual(brands, self.brand)
@@ -0,0 +1,39 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo.tests import common
+
+
+class TestFleetVehicleName(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.brand = cls.env["fleet.vehicle.model.brand"].create({"name": "Audi"})
+        cls.model = cls.env["fleet.vehicle.model"].create({"brand_id": cls.brand.id, "name": "A3"})
+        cls.vehicles = cls.env["fleet.vehicle"].create([
+            {"model_id": cls.model.id, "license_plate": "1-ACK-%s" % i} for i in range(3)
+        ])
+        cls.contract = cls.env["fleet.vehicle.log.contract"].create({"vehicle_id": cls.vehicles[0].id})
+
+    def _stored_names(self, records):
+        self.env.flush_all()
+        self.env.cr.execute(f"SELECT name FROM {records._table} WHERE id IN %s ORDER BY id", [tuple(records.ids)])
+        return [name for name, in self.env.cr.fetchall()]
+
+    def test_rename_below_threshold(self):
+        self.brand.name = "Audi AG"
+        self.assertEqual(self._stored_names(self.vehicles), ["Audi AG/A3/1-ACK-%s" % i for i in range(3)])
+
+    def test_deferred_rename(self):
+        self.env['ir.config_parameter'].set_param('fleet.name_cascade_threshold', 2)
+        contract_name = self.contract.name
+        self.brand.name = "Audi AG"
+        self.assertEqual(self._stored_names(self.vehicles), ["Audi/A3/1-ACK-%s" % i for i in range(3)])
+        self.assertEqual(self._stored_names(self.contract), [contract_name])
+        self.assertEqual(self.vehicles[0].display_name, "Audi AG/A3/1-ACK-0", "Vehicles are displayed with their new name")
+
+        self.model.name = "A4"
+        self.env['fleet.vehicle']._process_name_queue(batch_size=2)
+        self.assertEqual(self._stored_names(self.vehicles), ["Audi AG/A4/1-ACK-%s" % i for i in range(3)])
+        self.assertIn("Audi AG/A4/1-ACK-0", self._stored_names(self.contract)[0])
+        self.env.cr.execute("SELECT COUNT(*) FROM fleet_vehicle_name_queue")
+        self.assertEqual(self.env.cr.fetchone()[0], 0)
@@ -17,6 +17,12 @@ class FleetVehicleSendMail(models.TransientModel):
         string='Attachments',
         bypass_search_access=True,
     )
+    group_by_driver = fields.Boolean(
+        'One Message per Driver',
+        help="Send a single message to the drivers of several vehicles, posted on the first of them.")
+    job_id = fields.Many2one('fleet.vehicle.send.mail.job', 'Mailing', readonly=True)
+    job_state = fields.Selection(related='job_id.state')
+    job_progress = fields.Float(related='job_id.progress')
 
     @api.depends('subject')
     def _compute_render_model(self):
@@ -39,22 +45,24 @@ class FleetVehicleSendMail(models.TransientModel):
                 }
             }
 
-        if self.template_id:
-            subjects = self._render_field(field='subject', res_ids=self.vehicle_ids.ids)
-            bodies = self._render_field(field='body', res_ids=self.vehicle_ids.ids)
-        else:
-            subjects = {vehicle.id: self.subject for vehicle in self.vehicle_ids}
-            bodies = {vehicle.id: self.body for vehicle in self.vehicle_ids}
+        if not self.job_id:
+            self.job_id = self.env['fleet.vehicle.send.mail.job']._create_job(self.vehicle_ids, {
+                'author_id': self.author_id.id,
+                'template_id': self.template_id.id,
+                'subject': self.subject,
+                'body': self.body,
+                'group_by_driver': self.group_by_driver,
+            })
+        return self.action_refresh()
 
-        for vehicle in self.vehicle_ids:
-            vehicle.message_post(
-                author_id=self.author_id.id,
-                body=bodies[vehicle.id],
-                email_layout_xmlid='mail.mail_notification_light',
-                message_type='comment',
-                partner_ids=vehicle.driver_id.ids,
-                subject=subjects[vehicle.id],
-            )
+    def action_refresh(self):
+        return {
+            'type': 'ir.actions.act_window',
+            'view_mode': 'form',
+            'res_id': self.id,
+            'res_model': self._name,
+            'target': 'new',
+        }
 
     def action_save_as_template(self):
         model = self.env['ir.model']._get('fleet.vehicle')
@@ -1,37 +1,55 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
+import re
+
 from odoo import api, fields, models
+from odoo.fields import Domain
+
+# Specifications of fleet.vehicle.model copied as is onto the vessels
+VESSEL_SPECIFICATIONS = [
+    'vessel_length', 'vessel_beam', 'vessel_draft', 'vessel_tonnage', 'vessel_type_detail', 'vessel_flag',
+    'hull_material', 'engine_type', 'max_speed_knots', 'passenger_capacity', 'crew_capacity',
+    'length_unit', 'tonnage_unit',
+]
+
+# Identifiers of the vessels searched along with the vehicle names
+VESSEL_IDENTIFIERS = ['vessel_imo_number', 'vessel_mmsi', 'vessel_call_sign']
+IMO_NUMBER_RE = re.compile(r'^\s*(?:IMO)?\s*(\d{7})\s*$', re.IGNORECASE)
+MMSI_RE = re.compile(r'^\s*(\d{9})\s*$')
 
 
 class FleetVehicle(models.Model):
     _inherit = 'fleet.vehicle'
 
+    _vessel_imo_number_idx = models.Index("(vessel_imo_number) WHERE vessel_imo_number IS NOT NULL")
+    _vessel_mmsi_idx = models.Index("(vessel_mmsi) WHERE vessel_mmsi IS NOT NULL")
+
     # Vessel dimensions
     vessel_length = fields.Float(
         string='Length',
-        compute='_compute_vessel_length',
+        compute='_compute_vessel_specifications',
         store=True,
         readonly=False,
         tracking=True
     )
     vessel_beam = fields.Float(
         string='Beam',
-        compute='_compute_vessel_beam',
+        compute='_compute_vessel_specifications',
         store=True,
         readonly=False,
         tracking=True
     )
     vessel_draft = fields.Float(
         string='Draft',
-        compute='_compute_vessel_draft',
+        compute='_compute_vessel_specifications',
         store=True,
         readonly=False,
         tracking=True
     )
     vessel_tonnage = fields.Float(
         string='Tonnage',
-        compute='_compute_vessel_tonnage',
+        compute='_compute_vessel_specifications',
         store=True,
         readonly=False,
         tracking=True
@@ -50,7 +68,7 @@ class FleetVehicle(models.Model):
         ('ferry', 'Ferry'),
         ('research', 'Research Vessel'),
     ], string='Vessel Type',
-        compute='_compute_vessel_type_detail',
+        compute='_compute_vessel_specifications',
         store=True,
         readonly=False,
         tracking=True
@@ -59,21 +77,24 @@ class FleetVehicle(models.Model):
     # Maritime identification
     vessel_flag = fields.Char(
         string='Flag State',
-        compute='_compute_vessel_flag',
+        compute='_compute_vessel_specifications',
         store=True,
         readonly=False,
         tracking=True
     )
     vessel_imo_number = fields.Char(
         string='IMO Number',
+        index='trigram',
         tracking=True
     )
     vessel_mmsi = fields.Char(
         string='MMSI',
+        index='trigram',
         tracking=True
     )
     vessel_call_sign = fields.Char(
         string='Call Sign',
+        index='trigram',
         tracking=True
     )
 
@@ -86,7 +107,7 @@ class FleetVehicle(models.Model):
         ('composite', 'Composite'),
         ('concrete', 'Concrete'),
     ], string='Hull Material',
-        compute='_compute_hull_material',
+        compute='_compute_vessel_specifications',
         store=True,
         readonly=False,
         tracking=True
@@ -100,7 +121,7 @@ class FleetVehicle(models.Model):
         ('sail', 'Sail'),
         ('nuclear', 'Nuclear'),
     ], string='Propulsion Type',
-        compute='_compute_engine_type',
+        compute='_compute_vessel_specifications',
         store=True,
         readonly=False,
         tracking=True
@@ -109,7 +130,7 @@ class FleetVehicle(models.Model):
     # Performance
     max_speed_knots = fields.Float(
         string='Max Speed (knots)',
-        compute='_compute_max_speed_knots',
+        compute='_compute_vessel_specifications',
         store=True,
         readonly=False,
         tracking=True
@@ -118,14 +139,14 @@ class FleetVehicle(models.Model):
     # Capacity
     passenger_capacity = fields.Integer(
         string='Passenger Capacity',
-        compute='_compute_passenger_capacity',
+        compute='_compute_vessel_specifications',
         store=True,
         readonly=False,
         tracking=True
     )
     crew_capacity = fields.Integer(
         string='Crew Capacity',
-        compute='_compute_crew_capacity',
+        compute='_compute_vessel_specifications',
         store=True,
         readonly=False,
         tracking=True
@@ -136,7 +157,7 @@ class FleetVehicle(models.Model):
         ('m', 'Meters'),
         ('ft', 'Feet'),
     ], string='Length Unit',
-        compute='_compute_length_unit',
+        compute='_compute_vessel_specifications',
         store=True,
         readonly=False,
         default='m',
@@ -149,75 +170,93 @@ class FleetVehicle(models.Model):
         ('st', 'Short Tons'),
         ('gt', 'Gross Tonnage'),
     ], string='Tonnage Unit',
-        compute='_compute_tonnage_unit',
+        compute='_compute_vessel_specifications',
         store=True,
         readonly=False,
         default='mt',
         tracking=True
     )
 
-    # Compute methods to inherit from model
-    @api.depends('model_id.vessel_length')
-    def _compute_vessel_length(self):
-        for vehicle in self:
-            vehicle.vessel_length = vehicle.model_id.vessel_length
-
-    @api.depends('model_id.vessel_beam')
-    def _compute_vessel_beam(self):
-        for vehicle in self:
-            vehicle.vessel_beam = vehicle.model_id.vessel_beam
-
-    @api.depends('model_id.vessel_draft')
-    def _compute_vessel_draft(self):
-        for vehicle in self:
-            vehicle.vessel_draft = vehicle.model_id.vessel_draft
-
-    @api.depends('model_id.vessel_tonnage')
-    def _compute_vessel_tonnage(self):
-        for vehicle in self:
-            vehicle.vessel_tonnage = vehicle.model_id.vessel_tonnage
-
-    @api.depends('model_id.vessel_type_detail')
-    def _compute_vessel_type_detail(self):
-        for vehicle in self:
-            vehicle.vessel_type_detail = vehicle.model_id.vessel_type_detail
-
-    @api.depends('model_id.vessel_flag')
-    def _compute_vessel_flag(self):
-        for vehicle in self:
-            vehicle.vessel_flag = vehicle.model_id.vessel_flag
-
-    @api.depends('model_id.hull_material')
-    def _compute_hull_material(self):
-        for vehicle in self:
-            vehicle.hull_material = vehicle.model_id.hull_material
-
-    @api.depends('model_id.engine_type')
-    def _compute_engine_type(self):
-        for vehicle in self:
-            vehicle.engine_type = vehicle.model_id.engine_type
-
-    @api.depends('model_id.max_speed_knots')
-    def _compute_max_speed_knots(self):
-        for vehicle in self:
-            vehicle.max_speed_knots = vehicle.model_id.max_speed_knots
-
-    @api.depends('model_id.passenger_capacity')
-    def _compute_passenger_capacity(self):
-        for vehicle in self:
-            vehicle.passenger_capacity = vehicle.model_id.passenger_capacity
-
-    @api.depends('model_id.crew_capacity')
-    def _compute_crew_capacity(self):
-        for vehicle in self:
-            vehicle.crew_capacity = vehicle.model_id.crew_capacity
-
-    @api.depends('model_id.length_unit')
-    def _compute_length_unit(self):
-        for vehicle in self:
-            vehicle.length_unit = vehicle.model_id.length_unit
-
-    @api.depends('model_id.tonnage_unit')
-    def _compute_tonnage_unit(self):
-        for vehicle in self:
-            vehicle.tonnage_unit = vehicle.model_id.tonnage_unit
+    @api.depends('model_id.vehicle_type', *('model_id.%s' % fname for fname in VESSEL_SPECIFICATIONS))
+    def _compute_vessel_specifications(self):
+        """ Copy the specifications of the vessel models onto their vessels,
+        all fields at once and once per model. Other vehicles get the empty
+        specifications, so that none is kept from a former vessel model. """
+        vessels = self.filtered(lambda vehicle: vehicle.vehicle_type == 'vessel')
+        for model, model_vessels in vessels.grouped('model_id').items():
+            model_vessels.update({
+                fname: model._fields[fname].convert_to_write(model[fname], model)
+                for fname in VESSEL_SPECIFICATIONS
+            })
+        (self - vessels).update(self._get_empty_vessel_specifications())
+
+    def _get_empty_vessel_specifications(self):
+        """ Return the specifications of a vehicle that is not a vessel: the
+        defaults of the fields, or no value. """
+        return {
+            fname: self._fields[fname].default(self) if self._fields[fname].default else False
+            for fname in VESSEL_SPECIFICATIONS
+        }
+
+    @api.model
+    def _search_display_name(self, operator, value):
+        """ Search the vessel identifiers along with the vehicle names. A value
+        that is a complete IMO number or MMSI matching a vessel only searches
+        that identifier, through its exact index. """
+        if operator in Domain.NEGATIVE_OPERATORS or not isinstance(value, str):
+            return super()._search_display_name(operator, value)
+        identifier_domain = self._get_vessel_identifier_domain(value)
+        if identifier_domain and self.search_count(identifier_domain, limit=1):
+            return identifier_domain
+        domain = super()._search_display_name(operator, value)
+        if domain is NotImplemented:
+            return domain
+        return Domain.OR([domain, *(Domain(fname, operator, value) for fname in VESSEL_IDENTIFIERS)])
+
+    @api.model
+    def _get_vessel_identifier_domain(self, value):
+        """ Return the domain matching the vessels identified by ``value`` when
+        it is an IMO number or a MMSI, or ``None``. """
+        if match := IMO_NUMBER_RE.match(value):
+            number = match.group(1)
+            return Domain('vessel_imo_number', 'in', [number, 'IMO' + number, 'IMO ' + number])
+        if match := MMSI_RE.match(value):
+            return Domain('vessel_mmsi', '=', match.group(1))
+        return None
+
+    @api.model
+    def _get_tracking_groups(self):
+        groups = super()._get_tracking_groups()
+        groups['vessel_specifications'] = list(VESSEL_SPECIFICATIONS)
+        return groups
+
+    def _add_vessel_specifications(self, vals_list):
+        """ Complete ``vals_list`` in place with the specifications of the
+        models they refer to, without overriding the given values: the ones
+        of the vessel models, and empty ones for the other models. See
+        ``_add_model_specifications``. """
+        model_ids = {vals['model_id'] for vals in vals_list if vals.get('model_id')}
+        if not model_ids:
+            return
+        empty = self._get_empty_vessel_specifications()
+        specifications = {
+            model.id: {
+                fname: model._fields[fname].convert_to_write(model[fname], model)
+                for fname in VESSEL_SPECIFICATIONS
+            } if model.vehicle_type == 'vessel' else empty
+            for model in self.env['fleet.vehicle.model'].browse(model_ids)
+        }
+        for vals in vals_list:
+            for fname, value in specifications.get(vals.get('model_id'), {}).items():
+                vals.setdefault(fname, value)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self._add_vessel_specifications(vals_list)
+        return super().create(vals_list)
+
+    def write(self, vals):
+        if vals.get('model_id') and not set(VESSEL_SPECIFICATIONS).isdisjoint(vals):
+            vals = dict(vals)
+            self._add_vessel_specifications([vals])
+        return super().write(vals)
@@ -0,0 +1,5 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from . import test_name_search
+from . import test_tracking
+from . import test_vessel_specifications
@@ -0,0 +1,32 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo.tests import common
+
+
+class TestFleetVesselNameSearch(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        brand = cls.env["fleet.vehicle.model.brand"].create({"name": "Shipyard"})
+        model = cls.env["fleet.vehicle.model"].create({"brand_id": brand.id, "name": "Trawler", "vehicle_type": "vessel"})
+        cls.vessel, cls.other = cls.env["fleet.vehicle"].create([{
+            "model_id": model.id,
+            "license_plate": "VESSEL-1",
+            "vessel_imo_number": "9074729",
+            "vessel_mmsi": "227006760",
+            "vessel_call_sign": "FNRS",
+        }, {
+            "model_id": model.id,
+            "license_plate": "9074729",
+        }])
+
+    def _name_search(self, value):
+        Vehicle = self.env['fleet.vehicle']
+        return Vehicle.browse([id_ for id_, _name in Vehicle.name_search(value)])
+
+    def test_vessel_identifiers(self):
+        self.assertEqual(self._name_search('IMO 9074729'), self.vessel, "An IMO number only matches its vessel")
+        self.assertEqual(self._name_search('9074729'), self.vessel)
+        self.assertEqual(self._name_search('227006760'), self.vessel)
+        self.assertIn(self.vessel, self._name_search('fnr'))
+        self.assertIn(self.other, self._name_search('907472'), "Partial identifiers are searched fuzzily")
@@ -0,0 +1,132 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import logging
+import time
+
+from odoo.tests import common, tagged
+
+from odoo.addons.fleet.tests.test_performance import benchmark_sizes
+
+_logger = logging.getLogger(__name__)
+
+
+class TestFleetTrackingCommon(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        brand = cls.env["fleet.vehicle.model.brand"].create({"name": "Shipyard"})
+        cls.vessel_model = cls.env["fleet.vehicle.model"].create({
+            "brand_id": brand.id,
+            "name": "Trawler",
+            "vehicle_type": "vessel",
+            "vessel_length": 10,
+        })
+
+    def _create_vessels(self, count):
+        return self.env["fleet.vehicle"].with_context(tracking_disable=True).create([
+            {"model_id": self.vessel_model.id, "license_plate": "SHIP-%s" % i} for i in range(count)
+        ])
+
+    def _run_tracking(self):
+        self.env.flush_all()
+        self.env.cr.precommit.run()
+
+    def _count_rows(self):
+        self.env.cr.execute("SELECT (SELECT COUNT(*) FROM mail_message), (SELECT COUNT(*) FROM mail_tracking_value)")
+        return self.env.cr.fetchone()
+
+
+class TestFleetCoalescedTracking(TestFleetTrackingCommon):
+
+    def setUp(self):
+        super().setUp()
+        self.vessels = self._create_vessels(3)
+        self._run_tracking()
+
+    def _vessel_messages(self):
+        return self.env['mail.message'].search([('model', '=', 'fleet.vehicle'), ('res_id', 'in', self.vessels.ids)])
+
+    def test_coalesced_per_vehicle(self):
+        self.vessel_model.vessel_length = 12
+        self._run_tracking()
+        messages = self._vessel_messages()
+        self.assertEqual(sorted(messages.mapped('res_id')), sorted(self.vessels.ids))
+        for message in messages:
+            self.assertEqual(message.tracking_value_ids.field_id.name, 'vessel_length')
+            self.assertEqual(message.tracking_value_ids.old_value_float, 10)
+            self.assertEqual(message.tracking_value_ids.new_value_float, 12)
+
+    def test_coalesced_per_model(self):
+        self.env['ir.config_parameter'].set_param('fleet.tracking_coalesce.vessel_specifications', 'model')
+        self.vessel_model.vessel_length = 12
+        self._run_tracking()
+        self.assertFalse(self._vessel_messages())
+        message = self.env['mail.message'].search([
+            ('model', '=', 'fleet.vehicle.model'), ('res_id', '=', self.vessel_model.id), ('body', 'ilike', 'SHIP-'),
+        ])
+        self.assertEqual(len(message), 1)
+        for vessel in self.vessels:
+            self.assertIn(vessel.license_plate, message.body)
+
+    def test_not_coalesced(self):
+        self.env['ir.config_parameter'].set_param('fleet.tracking_coalesce.vessel_specifications', 'off')
+        self.vessel_model.vessel_length = 12
+        self._run_tracking()
+        messages = self._vessel_messages()
+        self.assertEqual(len(messages), len(self.vessels))
+        self.assertEqual(set(messages.tracking_value_ids.field_id.mapped('name')), {'vessel_length'})
+
+    def test_vehicle_edit_not_coalesced(self):
+        """ Editing a vessel itself is tracked as usual. """
+        vessel = self.vessels[0]
+        vessel.vessel_length = 12
+        self._run_tracking()
+        message = self._vessel_messages()
+        self.assertEqual(message.res_id, vessel.id)
+        self.assertNotIn("Specifications updated from the model.", message.body)
+        self.assertEqual(message.tracking_value_ids.field_id.name, 'vessel_length')
+
+    def test_coalesced_per_model_links(self):
+        """ The message logged on a model lists a limited number of vehicles. """
+        self.env['ir.config_parameter'].set_param('fleet.tracking_coalesce.vessel_specifications', 'model')
+        vessels = self._create_vessels(25)
+        self._run_tracking()
+        self.vessel_model.vessel_length = 12
+        self._run_tracking()
+        message = self.env['mail.message'].search([
+            ('model', '=', 'fleet.vehicle.model'), ('res_id', '=', self.vessel_model.id), ('body', 'ilike', 'SHIP-'),
+        ])
+        self.assertEqual(message.body.count('<li>'), 21)
+        self.assertIn("and %s other vehicles" % (len(vessels) + len(self.vessels) - 20), message.body)
+
+
+@tagged('post_install', '-at_install', '-standard', 'fleet_perf')
+class TestFleetCoalescedTrackingPerformance(TestFleetTrackingCommon):
+
+    def test_coalesced_tracking_cost(self):
+        """ Measure the rows written and the time spent tracking the update of
+        a vessel model, depending on the coalescing mode. """
+        for size in benchmark_sizes('100,1000,10000'):
+            vessels = self._create_vessels(size)
+            self._run_tracking()
+            results = {}
+            for index, mode in enumerate(('off', 'vehicle', 'model')):
+                self.env['ir.config_parameter'].set_param('fleet.tracking_coalesce.vessel_specifications', mode)
+                rows_before = self._count_rows()
+                queries_before = self.cr.sql_log_count
+                start = time.perf_counter()
+                self.vessel_model.vessel_length = 20 + index
+                self._run_tracking()
+                duration = time.perf_counter() - start
+                queries = self.cr.sql_log_count - queries_before
+                messages, tracking_values = (after - before for after, before in zip(self._count_rows(), rows_before))
+                results[mode] = (messages, queries)
+                _logger.info(
+                    "fleet tracking of %s vessels, %s mode: %.3fs, %s queries, %s messages, %s tracking values",
+                    size, mode, duration, queries, messages, tracking_values,
+                )
+            self.assertEqual(results['vehicle'][0], results['off'][0])
+            self.assertLess(results['vehicle'][1], results['off'][1])
+            # the model logs its own tracking besides the summary
+            self.assertLessEqual(results['model'][0], 2)
+            vessels.unlink()
@@ -0,0 +1,55 @@
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+from odoo.tests import common
+
+
+class TestFleetVesselSpecifications(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        brand = cls.env["fleet.vehicle.model.brand"].create({"name": "Shipyard"})
+        cls.vessel_model, cls.car_model = cls.env["fleet.vehicle.model"].create([{
+            "brand_id": brand.id,
+            "name": "Trawler",
+            "vehicle_type": "vessel",
+            "vessel_length": 24,
+            "hull_material": "steel",
+            "length_unit": "ft",
+            "crew_capacity": 6,
+        }, {
+            "brand_id": brand.id,
+            "name": "Van",
+            "vehicle_type": "car",
+        }])
+
+    def _assert_no_vessel_specifications(self, vehicle):
+        self.assertFalse(vehicle.vessel_length)
+        self.assertFalse(vehicle.hull_material)
+        self.assertFalse(vehicle.crew_capacity)
+        self.assertEqual(vehicle.length_unit, 'm')
+
+    def test_switch_models(self):
+        vehicle = self.env["fleet.vehicle"].create({"model_id": self.vessel_model.id})
+        self.assertEqual(vehicle.vessel_length, 24)
+        self.assertEqual(vehicle.hull_material, 'steel')
+        self.assertEqual(vehicle.length_unit, 'ft')
+
+        vehicle.model_id = self.car_model
+        self._assert_no_vessel_specifications(vehicle)
+        self.env.flush_all()
+        vehicle.invalidate_recordset()
+        self._assert_no_vessel_specifications(vehicle)
+
+        vehicle.model_id = self.vessel_model
+        self.assertEqual(vehicle.crew_capacity, 6)
+
+    def test_write_model_with_specifications(self):
+        vehicle = self.env["fleet.vehicle"].create({"model_id": self.vessel_model.id})
+        vehicle.write({"model_id": self.car_model.id, "vessel_beam": 3})
+        self.assertEqual(vehicle.vessel_beam, 3, "Given values are kept")
+        self._assert_no_vessel_specifications(vehicle)
+
+    def test_model_becomes_vehicle(self):
+        vehicle = self.env["fleet.vehicle"].create({"model_id": self.vessel_model.id})
+        self.vessel_model.vehicle_type = 'car'
+        self._assert_no_vessel_specifications(vehicle)